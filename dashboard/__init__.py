@@ -0,0 +1 @@
+"""Shared data and computation helpers for the education dashboard pages."""
@@ -0,0 +1,229 @@
+"""Benchmark the dashboard's data pipeline on synthetic data.
+
+    python -m dashboard.benchmark                       # scales 1, 10, 100
+    python -m dashboard.benchmark --scales 1 5 --repeat 5 --json bench.json
+
+Each scale multiplies the number of synthetic countries (1× is
+``BASE_COUNTRIES`` countries × every year from ``FIRST_YEAR`` to
+``LAST_YEAR``, about the size of education_data.csv).  For every stage the
+harness reports the best wall time over ``--repeat`` runs, the peak Python
+memory allocated by one run (tracemalloc) and, where the stage produces
+something that is sent to the browser or downloaded, the payload size.
+For the map that is the rendered folium HTML; for the Trendline and
+Regional Comparison charts it is the Plotly figure JSON.
+
+Stages are run on fresh synthetic frames through the same functions the
+pages use, bypassing the process-wide caches, so the numbers are the
+cold-path cost.  The map stages build from the synthetic index frame and
+rankings through ``maps.map_from_data``, with the shared render cache
+cleared before every run.
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from dashboard import cube, data, exports, geometry, maps, ranking, regional, render, trends
+from dashboard.normalize import normalize_columns
+
+BASE_COUNTRIES = 200
+FIRST_YEAR, LAST_YEAR = 1990, 2024
+MISSING_SHARE = 0.3
+SEED = 0
+
+
+def synthetic_dataset(scale=1, seed=SEED):
+    """Raw-looking dataset: one row per (country, year), percentages with gaps.
+
+    The first countries reuse real names so region lookups hit; the rest
+    are "Country N" and fall into the "Other" region.
+    """
+    rng = np.random.default_rng(seed)
+    real_names = sorted(data.region_lookup("geographic_region")[0])
+    n_countries = BASE_COUNTRIES * scale
+    names = real_names[:n_countries] + [f"Country {i}" for i in range(len(real_names), n_countries)]
+
+    years = np.arange(FIRST_YEAR, LAST_YEAR + 1)
+    frame = {
+        "country": pd.Categorical(np.repeat(names, len(years))),
+        "year": np.tile(years, n_countries).astype(np.int16),
+    }
+    rows = len(frame["year"])
+    for column in data.DATASET_COLUMNS[2:] + data.OPTIONAL_COLUMNS:
+        values = rng.uniform(0, 100, rows).astype(np.float32)
+        values[rng.random(rows) < MISSING_SHARE] = np.nan
+        frame[column] = values
+    return pd.DataFrame(frame)
+
+
+def measure(func, repeat):
+    """(best seconds, peak traced bytes, result) of calling ``func()``."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak, result
+
+
+def _utf8_size(text):
+    return len(text.encode("utf-8"))
+
+
+def _stages(raw, year_range, version):
+    """(name, callable, payload function or None) for every benchmarked stage."""
+    metric = "Completion Index"
+    metric_cols = regional.METRIC_OPTIONS[metric]
+    normalized_columns = [c for c in raw.columns if c not in ("country", "year")]
+
+    def normalize():
+        return normalize_columns(raw.copy(deep=False), normalized_columns)
+
+    normalized = normalize()
+
+    def create_regional_data():
+        df = normalized.copy(deep=False)
+        for region_col in data.REGION_GROUPINGS:
+            df[region_col] = data.assign_regions(df["country"], region_col)
+        return df
+
+    regional_df = create_regional_data()
+    index_cube = cube.IndexCube(raw)
+    index_frame = index_cube.index_frame(year_range)
+
+    def rankings():
+        return ranking.rank_frame(index_frame, list(cube.INDEX_COLUMNS))
+
+    def regional_averages():
+        return regional.calculate_regional_averages(
+            regional_df, "geographic_region", metric_cols, regional.average_column(metric), year_range
+        )
+
+    def fit_trends():
+        in_range = raw["year"].between(*year_range).to_numpy()
+        return trends.fit_trends(raw["country"][in_range], raw["year"].to_numpy()[in_range],
+                                 raw["comp_prim_v2_m"].to_numpy()[in_range])
+
+    def ranking_payload(result):
+        column = "completion_index"
+        return len(exports.serialize(result[column][["rank", "country", column]]))
+
+    def render_map(map_type):
+        value_column = maps.METRIC_COLUMNS[metric]
+        country_ranking = ranking.rank_frame(index_frame, [value_column])[value_column]
+
+        def render_html():
+            # Cold path: don't reuse the layer data of the previous run
+            render.RENDER_CACHE.clear()
+            m = maps.map_from_data(metric, map_type, index_frame, country_ranking, (year_range, version))
+            return m.get_root().render()
+        return render_html
+
+    def trend_figure():
+        # Trendline with every country selected: one WebGL trace plus the band
+        import plotly.graph_objects as go
+
+        column = "comp_prim_v2_m"
+        # The page plots normalized values on the 0-100 scale
+        percent = normalized[["country", "year"]].assign(**{column: normalized[column] * 100})
+        in_range = percent.loc[percent["year"].between(*year_range)].dropna()
+        in_range = in_range.sort_values(["country", "year"])
+        x, y, names = trends.merged_series(in_range["country"], in_range["year"], in_range[column])
+        band = trends.country_percentiles(percent["country"], percent["year"].to_numpy(),
+                                          percent[column].to_numpy(), year_range)
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=band["year"], y=band["high"], mode="lines", line=dict(width=0)))
+        fig.add_trace(go.Scatter(x=band["year"], y=band["low"], mode="lines", fill="tonexty", line=dict(width=0)))
+        fig.add_trace(go.Scatter(x=band["year"], y=band["median"], mode="lines"))
+        fig.add_trace(go.Scattergl(x=x, y=y, customdata=names, mode="lines+markers"))
+        return fig.to_json()
+
+    def regional_figure():
+        import plotly.express as px
+
+        averages = regional_averages()
+        averages = averages[averages["geographic_region"] != data.OTHER_REGION]
+        fig = px.bar(averages, x="geographic_region", y=regional.average_column(metric),
+                     color="geographic_region", color_discrete_sequence=px.colors.qualitative.Set3)
+        return fig.to_json()
+
+    try:
+        geometry.get_geojson(zoom=2)
+        map_stages = [
+            ("map_render_choropleth", render_map("Choropleth"), _utf8_size),
+            ("map_render_bubble", render_map("Circle Bubble"), _utf8_size),
+        ]
+    except FileNotFoundError:
+        map_stages = []
+
+    return [
+        ("normalize", normalize, None),
+        ("create_regional_data", create_regional_data, None),
+        ("index_cube_build", lambda: cube.IndexCube(raw), None),
+        ("index_frame", lambda: index_cube.index_frame(year_range), None),
+        ("rankings", rankings, ranking_payload),
+        ("calculate_regional_averages", regional_averages, lambda result: len(exports.serialize(result))),
+        ("fit_trends", fit_trends, lambda result: len(exports.serialize(result.reset_index()))),
+        *map_stages,
+        ("trend_figure", trend_figure, _utf8_size),
+        ("regional_figure", regional_figure, _utf8_size),
+    ]
+
+
+def run(scales=(1, 10, 100), repeat=3, year_range=(2015, 2024)):
+    """Benchmark every stage at every scale; return a list of result dicts."""
+    results = []
+    for scale in scales:
+        raw = synthetic_dataset(scale)
+        for stage, func, payload in _stages(raw, tuple(year_range), f"benchmark-{scale}"):
+            seconds, peak, result = measure(func, repeat)
+            results.append({
+                "scale": scale,
+                "rows": len(raw),
+                "stage": stage,
+                "seconds": seconds,
+                "peak_bytes": peak,
+                "payload_bytes": payload(result) if payload else None,
+            })
+    return results
+
+
+def format_table(results):
+    lines = [f"{'scale':>5} {'rows':>9}  {'stage':<28} {'time (ms)':>10} {'peak (MB)':>10} {'payload (KB)':>13}"]
+    for r in results:
+        payload = f"{r['payload_bytes'] / 1024:13.1f}" if r["payload_bytes"] is not None else f"{'-':>13}"
+        lines.append(
+            f"{r['scale']:>5} {r['rows']:>9}  {r['stage']:<28} {r['seconds'] * 1000:10.2f} "
+            f"{r['peak_bytes'] / 2**20:10.2f} {payload}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard computations on synthetic data.")
+    parser.add_argument("--scales", nargs="+", type=int, default=[1, 10, 100], help="dataset size multipliers")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per stage (best is reported)")
+    parser.add_argument("--year-range", nargs=2, type=int, default=[2015, 2024], metavar=("START", "END"))
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = run(args.scales, args.repeat, tuple(args.year_range))
+    print(format_table(results))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""Precomputed (country, year, index) cube for the map page indices.
+
+For every country and year the cube stores the sums of the normalized
+sub-metrics over rows where all of an index's sub-metrics are present, plus
+the number of such rows.  Prefix sums along the year axis turn the per-country
+mean for any year range into two lookups, so moving the year slider costs
+O(countries) rather than a filter + groupby over every row.
+
+The Dropout Index is not averaged over the range: it uses the latest year in
+the range with complete data (the first such row of that year), so for it the
+cube stores that row and a "latest valid year" lookup instead.
+"""
+
+import copy
+
+import numpy as np
+import pandas as pd
+
+from dashboard import data
+from dashboard.normalize import normalize_percentages
+
+# Sub-metric columns of each map index
+INDEX_COLUMNS = {
+    "completion_index": [
+        "comp_prim_v2_m", "comp_lowsec_v2_m", "comp_upsec_v2_m",
+        "comp_prim_1524_m", "comp_lowsec_1524_m", "comp_upsec_2029_m"
+    ],
+    "attainment_index": ["edu2_2024_m", "edu4_2024_m"],
+    "higher_ed_completion_index": ["comp_higher_2yrs_2529_m", "comp_higher_4yrs_2529_m"],
+    "dropout_index": ["eduout_prim_m", "eduout_lowsec_m", "eduout_upsec_m"],
+}
+
+# Indices that take the latest complete year instead of a mean over the range
+LATEST_ONLY_INDICES = {"dropout_index"}
+
+
+class IndexCube:
+    """Per-country, per-year sums and counts for every map index."""
+
+    def __init__(self, df, year_span=None):
+        countries = df["country"].astype("category")
+        self.countries = pd.Index(countries.cat.categories, name="country")
+        self.first_year, self.last_year = year_span or (int(df["year"].min()), int(df["year"].max()))
+
+        n_countries = len(self.countries)
+        n_years = self.last_year - self.first_year + 1
+        self._shape = (n_countries, n_years)
+        cell = countries.cat.codes.to_numpy(dtype=np.int64) * n_years + (
+            df["year"].to_numpy(dtype=np.int64) - self.first_year
+        )
+
+        self._prefix_sums = {}
+        self._prefix_counts = {}
+        self._latest_values = {}
+        self._latest_year = {}
+        for index_name, columns in INDEX_COLUMNS.items():
+            values = df[columns].to_numpy(dtype=np.float64, copy=True)
+            normalize_percentages(values, out=values)
+            complete = ~np.isnan(values).any(axis=1)
+            index_cells = cell[complete]
+            values = values[complete]
+
+            if index_name in LATEST_ONLY_INDICES:
+                self._build_latest(index_name, index_cells, values)
+            else:
+                self._build_prefix(index_name, index_cells, values)
+
+    def updated(self, df, countries):
+        """Copy of the cube with only the rows of ``countries`` rebuilt from ``df``.
+
+        ``df`` is the whole new frame.  Returns None when its country list or
+        year span differs from this cube's, which needs a full build instead.
+        """
+        new_countries = df["country"].astype("category").cat.categories
+        if (not new_countries.equals(self.countries)
+                or int(df["year"].min()) != self.first_year or int(df["year"].max()) != self.last_year):
+            return None
+
+        positions = self.countries.get_indexer(list(countries))
+        if (positions < 0).any():
+            return None
+        rows = df["country"].isin(countries)
+        changed_df = pd.DataFrame({column: df[column][rows] for column in df.columns})
+        changed_df["country"] = pd.Categorical(changed_df["country"].astype(str), categories=self.countries[positions])
+        changed = IndexCube(changed_df, year_span=(self.first_year, self.last_year))
+
+        cube = copy.copy(self)
+        for name in ("_prefix_sums", "_prefix_counts", "_latest_values", "_latest_year"):
+            arrays = {}
+            for index_name, array in getattr(self, name).items():
+                arrays[index_name] = array.copy()
+                arrays[index_name][positions] = getattr(changed, name)[index_name]
+            setattr(cube, name, arrays)
+        return cube
+
+    def _build_prefix(self, index_name, cells, values):
+        n_cells = self._shape[0] * self._shape[1]
+        sums = np.column_stack([
+            np.bincount(cells, weights=values[:, i], minlength=n_cells)
+            for i in range(values.shape[1])
+        ]) if len(cells) else np.zeros((n_cells, values.shape[1]))
+        counts = np.bincount(cells, minlength=n_cells)
+
+        # Leading zero slice so a range sum is prefix[end] - prefix[start]
+        sums = sums.reshape(self._shape + (values.shape[1],))
+        counts = counts.reshape(self._shape)
+        prefix_sums = np.zeros((self._shape[0], self._shape[1] + 1, values.shape[1]))
+        # Row counts per country fit easily in int32
+        prefix_counts = np.zeros((self._shape[0], self._shape[1] + 1), dtype=np.int32)
+        np.cumsum(sums, axis=1, out=prefix_sums[:, 1:])
+        np.cumsum(counts, axis=1, out=prefix_counts[:, 1:])
+        self._prefix_sums[index_name] = prefix_sums
+        self._prefix_counts[index_name] = prefix_counts
+
+    def _build_latest(self, index_name, cells, values):
+        n_cells = self._shape[0] * self._shape[1]
+        latest_values = np.full((n_cells, values.shape[1]), np.nan)
+        has_row = np.zeros(n_cells, dtype=bool)
+        # First complete row of each (country, year) cell, in file order
+        first_cells, first_rows = np.unique(cells, return_index=True)
+        latest_values[first_cells] = values[first_rows]
+        has_row[first_cells] = True
+
+        # latest_year[c, j]: last year offset <= j with a complete row, else -1
+        year_offsets = np.where(has_row.reshape(self._shape), np.arange(self._shape[1]), -1)
+        self._latest_year[index_name] = np.maximum.accumulate(year_offsets, axis=1).astype(np.int16)
+        self._latest_values[index_name] = latest_values.reshape(self._shape + (values.shape[1],))
+
+    def nbytes(self):
+        """Memory held by the cube's arrays."""
+        tables = (self._prefix_sums, self._prefix_counts, self._latest_values, self._latest_year)
+        return sum(array.nbytes for table in tables for array in table.values())
+
+    def _year_slice(self, year_range):
+        start = min(max(int(year_range[0]) - self.first_year, 0), self._shape[1])
+        stop = min(max(int(year_range[1]) - self.first_year + 1, 0), self._shape[1])
+        return start, max(start, stop)
+
+    def submetric_means(self, index_name, year_range):
+        """(n_countries, n_submetrics) means for ``year_range``; NaN where no data."""
+        start, stop = self._year_slice(year_range)
+        if index_name in LATEST_ONLY_INDICES:
+            n_countries, _, n_columns = self._latest_values[index_name].shape
+            means = np.full((n_countries, n_columns), np.nan)
+            if stop > start:
+                latest = self._latest_year[index_name][:, stop - 1]
+                found = np.flatnonzero(latest >= start)
+                means[found] = self._latest_values[index_name][found, latest[found]]
+            return means
+
+        sums = self._prefix_sums[index_name][:, stop] - self._prefix_sums[index_name][:, start]
+        counts = self._prefix_counts[index_name][:, stop] - self._prefix_counts[index_name][:, start]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts[:, None] > 0, sums / counts[:, None], np.nan)
+
+    def index_values(self, index_name, year_range):
+        """Index value per country (aligned with ``countries``) for ``year_range``."""
+        return self.submetric_means(index_name, year_range).mean(axis=1)
+
+    def index_frame(self, year_range, drop_empty=True):
+        """One row per country with data: sub-metric means and all four indices.
+
+        With ``drop_empty=False`` every country is kept, aligned with ``countries``.
+        """
+        frame = {"country": self.countries}
+        for index_name, columns in INDEX_COLUMNS.items():
+            means = self.submetric_means(index_name, year_range)
+            if index_name not in LATEST_ONLY_INDICES:
+                for i, column in enumerate(columns):
+                    frame[column] = means[:, i]
+            frame[index_name] = means.mean(axis=1)
+        df = pd.DataFrame(frame)
+        if not drop_empty:
+            return df
+        return df.dropna(subset=list(INDEX_COLUMNS), how="all").reset_index(drop=True)
+
+
+def get_cube(state=None):
+    """Cube of the served dataset version, built once per version."""
+    return (state or data.current_state()).derived("index_cube", _build_cube)
+
+
+def _build_cube(state):
+    columns = ["country", "year"] + [c for cols in INDEX_COLUMNS.values() for c in cols]
+    df = data.get_columns(columns, state=state)
+    # After a refresh only the countries with changed rows are rebuilt
+    previous = state.previous.cached("index_cube") if state.previous is not None else None
+    if previous is not None and state.changed is not None:
+        cube = previous.updated(df, state.changed["country"].unique())
+        if cube is not None:
+            return cube
+    return IndexCube(df)
+
+
+def index_frame(year_range):
+    """Index frame for ``year_range``, from the precomputed table when it is current."""
+    # Imported here: the precompute build imports this module
+    from dashboard import precompute
+
+    df = precompute.index_frame(year_range)
+    return df if df is not None else get_cube().index_frame(tuple(year_range))
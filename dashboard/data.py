@@ -0,0 +1,423 @@
+"""Shared, process-wide access to the education dataset.
+
+Every page used to keep its own ``@st.cache_data`` copy of the CSV with its own
+column list and country-name fixes.  This module owns a single frame holding
+the union of those columns, with country names normalized to the GeoJSON
+spelling, and hands pages column views of it instead of copies.
+
+The frame belongs to a ``DatasetState``.  When the CSV changes,
+``refresh.DatasetRefresher`` loads the new version beside the old one,
+works out which (country, year) rows changed and swaps the whole state in
+at once, so readers see either the old data or the new, never a mix.
+"""
+
+import functools
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from dashboard import metrics, store
+from dashboard.normalize import normalize_columns
+
+# Columns read by any page; optional ones are skipped if the CSV lacks them
+DATASET_COLUMNS = [
+    "country", "year",
+    "comp_prim_v2_m", "comp_lowsec_v2_m", "comp_upsec_v2_m",
+    "comp_prim_1524_m", "comp_lowsec_1524_m", "comp_upsec_2029_m",
+    "edu2_2024_m", "edu4_2024_m",
+    "comp_higher_2yrs_2529_m", "comp_higher_4yrs_2529_m",
+    "eduout_prim_m", "eduout_lowsec_m", "eduout_upsec_m"
+]
+OPTIONAL_COLUMNS = [
+    "attain_prim_m", "attain_lowsec_m", "attain_upsec_m",
+    "higher_ed_comp_v2_m"
+]
+
+# Dataset spellings -> names used in world-countries.json
+COUNTRY_NAME_MAP = {
+    "Rep. of Korea": "South Korea",
+    "Rep. Moldova": "Moldova",
+    "Trinidad/Tobago": "Trinidad and Tobago",
+    "Viet Nam": "Vietnam",
+    "North Macedonia": "Macedonia",
+    "Maldives": "Maldives",
+    "Comoros": "Comoros",
+    "Papua N. Guinea": "Papua New Guinea",
+    "Syrian A. R.": "Syria",
+    "C. A. R.": "Central African Republic",
+    "S. Tome/Principe": "Sao Tome and Principe",
+    "Bosnia/Herzeg.": "Bosnia and Herzegovina",
+    "Congo": "Republic of the Congo",
+    "Palestine": "Palestinian Territories",
+    "Timor-Leste": "East Timor",
+    "U. R. Tanzania": "United Republic of Tanzania",
+    "CГҧte d'Ivoire": "Ivory Coast",
+    "Venezuela, B. R.": "Venezuela",
+    "D. R. Congo": "Democratic Republic of the Congo",
+    "Saint Lucia": "St. Lucia",
+    "Dominican Rep.": "Dominican Republic",
+    "Equat. Guinea": "Equatorial Guinea",
+    "Turks/Caicos Is": "Turks and Caicos Islands",
+    "Russian Fed.": "Russia",
+    "Lao PDR": "Laos",
+    "Eswatini": "Swaziland",
+    "United States": "United States of America",
+    "Sao Tome and Principe": "Sao Tome and Principe",
+    "St. Lucia": "Saint Lucia"
+}
+
+# Country to flag emoji mapping
+COUNTRY_FLAGS = {
+    "Afghanistan": "🇦🇫", "Albania": "🇦🇱", "Algeria": "🇩🇿", "Andorra": "🇦🇩", "Angola": "🇦🇴",
+    "Antigua and Barbuda": "🇦🇬", "Argentina": "🇦🇷", "Armenia": "🇦🇲", "Australia": "🇦🇺", "Austria": "🇦🇹",
+    "Azerbaijan": "🇦🇿", "Bahamas": "🇧🇸", "Bahrain": "🇧🇭", "Bangladesh": "🇧🇩", "Barbados": "🇧🇧",
+    "Belarus": "🇧🇾", "Belgium": "🇧🇪", "Belize": "🇧🇿", "Benin": "🇧🇯", "Bhutan": "🇧🇹",
+    "Bolivia": "🇧🇴", "Bosnia and Herzegovina": "🇧🇦", "Botswana": "🇧🇼", "Brazil": "🇧🇷", "Brunei": "🇧🇳",
+    "Bulgaria": "🇧🇬", "Burkina Faso": "🇧🇫", "Burundi": "🇧🇮", "Cambodia": "🇰🇭", "Cameroon": "🇨🇲",
+    "Canada": "🇨🇦", "Cape Verde": "🇨🇻", "Central African Republic": "🇨🇫", "Chad": "🇹🇩", "Chile": "🇨🇱",
+    "China": "🇨🇳", "Colombia": "🇨🇴", "Comoros": "🇰🇲", "Congo": "🇨🇬", "Costa Rica": "🇨🇷",
+    "Croatia": "🇭🇷", "Cuba": "🇨🇺", "Cyprus": "🇨🇾", "Czech Republic": "🇨🇿", "Democratic Republic of the Congo": "🇨🇩",
+    "Denmark": "🇩🇰", "Djibouti": "🇩🇯", "Dominica": "🇩🇲", "Dominican Republic": "🇩🇴", "East Timor": "🇹🇱",
+    "Ecuador": "🇪🇨", "Egypt": "🇪🇬", "El Salvador": "🇸🇻", "Equatorial Guinea": "🇬🇶", "Eritrea": "🇪🇷",
+    "Estonia": "🇪🇪", "Eswatini": "🇸🇿", "Ethiopia": "🇪🇹", "Fiji": "🇫🇯", "Finland": "🇫🇮",
+    "France": "🇫🇷", "Gabon": "🇬🇦", "Gambia": "🇬🇲", "Georgia": "🇬🇪", "Germany": "🇩🇪",
+    "Ghana": "🇬🇭", "Greece": "🇬🇷", "Grenada": "🇬🇩", "Guatemala": "🇬🇹", "Guinea": "🇬🇳",
+    "Guinea-Bissau": "🇬🇼", "Guyana": "🇬🇾", "Haiti": "🇭🇹", "Honduras": "🇭🇳", "Hungary": "🇭🇺",
+    "Iceland": "🇮🇸", "India": "🇮🇳", "Indonesia": "🇮🇩", "Iran": "🇮🇷", "Iraq": "🇮🇶",
+    "Ireland": "🇮🇪", "Israel": "🇮🇱", "Italy": "🇮🇹", "Ivory Coast": "🇨🇮", "Jamaica": "🇯🇲",
+    "Japan": "🇯🇵", "Jordan": "🇯🇴", "Kazakhstan": "🇰🇿", "Kenya": "🇰🇪", "Kiribati": "🇰🇮",
+    "Kuwait": "🇰🇼", "Kyrgyzstan": "🇰🇬", "Laos": "🇱🇦", "Latvia": "🇱🇻", "Lebanon": "🇱🇧",
+    "Lesotho": "🇱🇸", "Liberia": "🇱🇷", "Libya": "🇱🇾", "Lithuania": "🇱🇹", "Luxembourg": "🇱🇺",
+    "Macedonia": "🇲🇰", "Madagascar": "🇲🇬", "Malawi": "🇲🇼", "Malaysia": "🇲🇾", "Maldives": "🇲🇻",
+    "Mali": "🇲🇱", "Malta": "🇲🇹", "Marshall Islands": "🇲🇭", "Mauritania": "🇲🇷", "Mauritius": "🇲🇺",
+    "Mexico": "🇲🇽", "Micronesia": "🇫🇲", "Moldova": "🇲🇩", "Monaco": "🇲🇨", "Mongolia": "🇲🇳",
+    "Montenegro": "🇲🇪", "Morocco": "🇲🇦", "Mozambique": "🇲🇿", "Myanmar": "🇲🇲", "Namibia": "🇳🇦",
+    "Nauru": "🇳🇷", "Nepal": "🇳🇵", "Netherlands": "🇳🇱", "New Zealand": "🇳🇿", "Nicaragua": "🇳🇮",
+    "Niger": "🇳🇪", "Nigeria": "🇳🇬", "North Korea": "🇰🇵", "Norway": "🇳🇴", "Oman": "🇴🇲",
+    "Pakistan": "🇵🇰", "Palau": "🇵🇼", "Panama": "🇵🇦", "Papua New Guinea": "🇵🇬", "Paraguay": "🇵🇾",
+    "Peru": "🇵🇪", "Philippines": "🇵🇭", "Poland": "🇵🇱", "Portugal": "🇵🇹", "Qatar": "🇶🇦",
+    "Republic of the Congo": "🇨🇬", "Romania": "🇷🇴", "Russia": "🇷🇺", "Rwanda": "🇷🇼", "Saint Kitts and Nevis": "🇰🇳",
+    "Saint Lucia": "🇱🇨", "Saint Vincent and the Grenadines": "🇻🇨", "Samoa": "🇼🇸", "San Marino": "🇸🇲", "Sao Tome and Principe": "🇸🇹",
+    "Saudi Arabia": "🇸🇦", "Senegal": "🇸🇳", "Serbia": "🇷🇸", "Seychelles": "🇸🇨", "Sierra Leone": "🇸🇱",
+    "Singapore": "🇸🇬", "Slovakia": "🇸🇰", "Slovenia": "🇸🇮", "Solomon Islands": "🇸🇧", "Somalia": "🇸🇴",
+    "South Africa": "🇿🇦", "South Korea": "🇰🇷", "South Sudan": "🇸🇸", "Spain": "🇪🇸", "Sri Lanka": "🇱🇰",
+    "Sudan": "🇸🇩", "Suriname": "🇸🇷", "Sweden": "🇸🇪", "Switzerland": "🇨🇭", "Syria": "🇸🇾",
+    "Taiwan": "🇹🇼", "Tajikistan": "🇹🇯", "Tanzania": "🇹🇿", "Thailand": "🇹🇭", "Togo": "🇹🇬",
+    "Tonga": "🇹🇴", "Trinidad and Tobago": "🇹🇹", "Tunisia": "🇹🇳", "Turkey": "🇹🇷", "Turkmenistan": "🇹🇲",
+    "Tuvalu": "🇹🇻", "Uganda": "🇺🇬", "Ukraine": "🇺🇦", "United Arab Emirates": "🇦🇪", "United Kingdom": "🇬🇧",
+    "United States": "🇺🇸", "United States of America": "🇺🇸", "Uruguay": "🇺🇾", "Uzbekistan": "🇺🇿", "Vanuatu": "🇻🇺",
+    "Vatican City": "🇻🇦", "Venezuela": "🇻🇪", "Vietnam": "🇻🇳", "Yemen": "🇾🇪", "Zambia": "🇿🇲",
+    "Zimbabwe": "🇿🇼"
+}
+
+
+def get_country_flag(country_name):
+    return _flag_lookup().get(country_name, "🏳️")  # Return neutral flag if country not found
+
+
+# Geographic regions
+GEOGRAPHIC_REGIONS = {
+    "Europe": ["Albania", "Andorra", "Austria", "Belarus", "Belgium", "Bosnia and Herzegovina",
+              "Bulgaria", "Croatia", "Czech Republic", "Denmark", "Estonia", "Finland", "France",
+              "Germany", "Greece", "Hungary", "Iceland", "Ireland", "Italy", "Latvia", "Lithuania",
+              "Luxembourg", "Macedonia", "Malta", "Moldova", "Monaco", "Montenegro", "Netherlands",
+              "Norway", "Poland", "Portugal", "Romania", "Russia", "San Marino", "Serbia",
+              "Slovakia", "Slovenia", "Spain", "Sweden", "Switzerland", "Ukraine", "United Kingdom"],
+
+    "Asia": ["Afghanistan", "Armenia", "Azerbaijan", "Bahrain", "Bangladesh", "Bhutan", "Brunei",
+            "Cambodia", "China", "Georgia", "India", "Indonesia", "Iran", "Iraq", "Israel",
+            "Japan", "Jordan", "Kazakhstan", "Kuwait", "Kyrgyzstan", "Laos", "Lebanon", "Malaysia",
+            "Maldives", "Mongolia", "Myanmar", "Nepal", "North Korea", "Oman", "Pakistan",
+            "Philippines", "Qatar", "Saudi Arabia", "Singapore", "South Korea", "Sri Lanka",
+            "Syria", "Taiwan", "Tajikistan", "Thailand", "Turkey", "Turkmenistan", "United Arab Emirates",
+            "Uzbekistan", "Vietnam", "Yemen"],
+
+    "Africa": ["Algeria", "Angola", "Benin", "Botswana", "Burkina Faso", "Burundi", "Cameroon",
+              "Cape Verde", "Central African Republic", "Chad", "Comoros", "Congo", "Democratic Republic of the Congo",
+              "Djibouti", "Egypt", "Equatorial Guinea", "Eritrea", "Ethiopia", "Gabon", "Gambia",
+              "Ghana", "Guinea", "Guinea-Bissau", "Ivory Coast", "Kenya", "Lesotho", "Liberia",
+              "Libya", "Madagascar", "Malawi", "Mali", "Mauritania", "Mauritius", "Morocco",
+              "Mozambique", "Namibia", "Niger", "Nigeria", "Rwanda", "Sao Tome and Principe",
+              "Senegal", "Seychelles", "Sierra Leone", "Somalia", "South Africa", "South Sudan",
+              "Sudan", "Tanzania", "Togo", "Tunisia", "Uganda", "Zambia", "Zimbabwe"],
+
+    "Americas": ["Antigua and Barbuda", "Argentina", "Bahamas", "Barbados", "Belize", "Bolivia",
+                "Brazil", "Canada", "Chile", "Colombia", "Costa Rica", "Cuba", "Dominica",
+                "Dominican Republic", "Ecuador", "El Salvador", "Grenada", "Guatemala", "Guyana",
+                "Haiti", "Honduras", "Jamaica", "Mexico", "Nicaragua", "Panama", "Paraguay",
+                "Peru", "Saint Kitts and Nevis", "Saint Lucia", "Saint Vincent and the Grenadines",
+                "Suriname", "Trinidad and Tobago", "United States", "Uruguay", "Venezuela"],
+
+    "Oceania": ["Australia", "Fiji", "Kiribati", "Marshall Islands", "Micronesia", "Nauru",
+               "New Zealand", "Palau", "Papua New Guinea", "Samoa", "Solomon Islands", "Tonga",
+               "Tuvalu", "Vanuatu"]
+}
+
+# Economic regions (World Bank income groups)
+ECONOMIC_REGIONS = {
+    "High Income": ["Australia", "Austria", "Belgium", "Canada", "Chile", "Croatia", "Czech Republic",
+                   "Denmark", "Estonia", "Finland", "France", "Germany", "Greece", "Hungary",
+                   "Iceland", "Ireland", "Israel", "Italy", "Japan", "Latvia", "Lithuania",
+                   "Luxembourg", "Malta", "Netherlands", "New Zealand", "Norway", "Poland",
+                   "Portugal", "Saudi Arabia", "Singapore", "Slovakia", "Slovenia", "South Korea",
+                   "Spain", "Sweden", "Switzerland", "Taiwan", "United Arab Emirates", "United Kingdom", "United States"],
+
+    "Upper Middle Income": ["Albania", "Argentina", "Armenia", "Azerbaijan", "Belarus", "Bosnia and Herzegovina",
+                           "Botswana", "Brazil", "Bulgaria", "China", "Colombia", "Costa Rica", "Cuba",
+                           "Dominican Republic", "Ecuador", "Georgia", "Guyana", "Indonesia", "Iran",
+                           "Iraq", "Jamaica", "Kazakhstan", "Kosovo", "Lebanon", "Libya", "Malaysia",
+                           "Maldives", "Mauritius", "Mexico", "Moldova", "Montenegro", "Namibia",
+                           "North Macedonia", "Panama", "Paraguay", "Peru", "Romania", "Russia",
+                           "Serbia", "South Africa", "Suriname", "Thailand", "Turkey", "Turkmenistan",
+                           "Uruguay", "Venezuela"],
+
+    "Lower Middle Income": ["Algeria", "Angola", "Bangladesh", "Benin", "Bhutan", "Bolivia", "Cambodia",
+                           "Cameroon", "Cape Verde", "Congo", "Côte d'Ivoire", "Egypt", "El Salvador",
+                           "Eswatini", "Ghana", "Guatemala", "Haiti", "Honduras", "India", "Kenya",
+                           "Kyrgyzstan", "Laos", "Lesotho", "Mauritania", "Micronesia", "Mongolia",
+                           "Morocco", "Myanmar", "Nicaragua", "Nigeria", "Pakistan", "Papua New Guinea",
+                           "Philippines", "Senegal", "Sri Lanka", "Sudan", "Tajikistan", "Tanzania",
+                           "Tunisia", "Ukraine", "Uzbekistan", "Vietnam", "Zambia"],
+
+    "Low Income": ["Afghanistan", "Burkina Faso", "Burundi", "Central African Republic", "Chad",
+                  "Comoros", "Democratic Republic of the Congo", "Djibouti", "Eritrea", "Ethiopia",
+                  "Gambia", "Guinea", "Guinea-Bissau", "Liberia", "Madagascar", "Malawi", "Mali",
+                  "Mozambique", "Niger", "Rwanda", "Sao Tome and Principe", "Sierra Leone",
+                  "Somalia", "South Sudan", "Syria", "Togo", "Uganda", "Yemen", "Zimbabwe"]
+}
+
+
+# Table spellings that are neither GeoJSON names nor COUNTRY_NAME_MAP keys
+COUNTRY_ALIASES = {
+    "Côte d'Ivoire": "Ivory Coast",
+    "Tanzania": "United Republic of Tanzania",
+}
+
+
+def _spellings(country):
+    """``country`` plus the normalized names it may appear under in the dataset."""
+    return {country, COUNTRY_NAME_MAP.get(country, country), COUNTRY_ALIASES.get(country, country)}
+
+
+@functools.lru_cache(maxsize=1)
+def _flag_lookup():
+    lookup = {}
+    for country, flag in COUNTRY_FLAGS.items():
+        for name in _spellings(country):
+            lookup.setdefault(name, flag)
+    lookup.update(COUNTRY_FLAGS)
+    return lookup
+
+
+# Region columns added by assign_regions and the groupings behind them
+REGION_GROUPINGS = {
+    "geographic_region": GEOGRAPHIC_REGIONS,
+    "economic_region": ECONOMIC_REGIONS,
+}
+OTHER_REGION = "Other"
+
+
+@functools.lru_cache(maxsize=None)
+def region_lookup(region_col):
+    """(country -> region dict, sorted region categories) for ``region_col``.
+
+    The region lists use everyday spellings, so each country is also
+    registered under its COUNTRY_NAME_MAP or COUNTRY_ALIASES spelling
+    ("United States" -> "United States of America") to match the normalized
+    dataset.
+    """
+    regions = REGION_GROUPINGS[region_col]
+    lookup = {}
+    for region, countries in regions.items():
+        for country in countries:
+            lookup[country] = region
+    for region, countries in regions.items():
+        for country in countries:
+            for name in _spellings(country):
+                lookup.setdefault(name, region)
+    # Alphabetical categories so groupby/sort order matches plain strings
+    return lookup, sorted(list(regions) + [OTHER_REGION])
+
+
+def assign_regions(countries, region_col):
+    """Categorical region for each entry of ``countries`` ("Other" if unlisted).
+
+    The lookup runs once per distinct country and is broadcast through the
+    categorical codes, so cost is O(rows) integer work, not one scan per region.
+    """
+    lookup, categories = region_lookup(region_col)
+    countries = countries.astype("category")
+    category_codes = {region: code for code, region in enumerate(categories)}
+    other = category_codes[OTHER_REGION]
+
+    per_country = np.array(
+        [category_codes[lookup.get(c, OTHER_REGION)] for c in countries.cat.categories] + [other],
+        dtype=np.int8
+    )
+    # Missing countries have code -1, which picks the trailing "Other" entry
+    codes = per_country[countries.cat.codes.to_numpy()]
+    return pd.Series(
+        pd.Categorical.from_codes(codes, categories=categories),
+        index=countries.index, name=region_col
+    )
+
+
+def normalize_country_names(countries):
+    """Apply COUNTRY_NAME_MAP to a country column, keeping it categorical."""
+    countries = countries.astype("category")
+    renamed = [COUNTRY_NAME_MAP.get(c, c) for c in countries.cat.categories]
+    if len(set(renamed)) == len(renamed):
+        # Keep categories alphabetical so sorting by country stays lexical
+        return countries.cat.rename_categories(renamed).cat.reorder_categories(sorted(renamed))
+    # Several spellings collapse onto one name, so categories can't just be renamed
+    return countries.astype(object).replace(COUNTRY_NAME_MAP).astype("category")
+
+
+def read_dataset(version_dir=None):
+    """Dataset frame from the column store (the up-to-date version unless pinned)."""
+    with metrics.timed("csv_load"):
+        available_columns = set(store.store_columns(version_dir=version_dir))
+        columns = DATASET_COLUMNS + [c for c in OPTIONAL_COLUMNS if c in available_columns]
+        df = store.read_columns(columns, version_dir=version_dir)
+        df["country"] = normalize_country_names(df["country"])
+    return df
+
+
+class DatasetState:
+    """One loaded version of the dataset, swapped in whole and never modified.
+
+    ``derived(name, build)`` memoizes values built from this version (the
+    normalized frame, the index cube, ...), so they are replaced together
+    with it.  ``range_version(year_range)`` is the generation of the last
+    refresh that changed rows within ``year_range``.  Caches keyed on it keep
+    their entries across refreshes that touched other years.
+    """
+
+    def __init__(self, version, frame, generation=0, base_generation=0, year_generations=None,
+                 previous=None, changed=None):
+        self.version = version
+        self.frame = frame
+        self.generation = generation
+        self.base_generation = base_generation
+        self.year_generations = year_generations or {}
+        # State this one was refreshed from and the (country, year) keys that
+        # differ, for incremental builds; dropped once the state is served
+        self.previous = previous
+        self.changed = changed
+        self._derived = {}
+        self._lock = threading.RLock()
+
+    def derived(self, name, build):
+        """``build(self)``, computed once for this version."""
+        if name not in self._derived:
+            with self._lock:
+                if name not in self._derived:
+                    self._derived[name] = build(self)
+        return self._derived[name]
+
+    def cached(self, name):
+        """Derived value ``name`` if it was already built, else None."""
+        return self._derived.get(name)
+
+    def range_version(self, year_range):
+        changed = [g for year, g in self.year_generations.items() if year_range[0] <= year <= year_range[1]]
+        return max([self.base_generation] + changed)
+
+
+_STATE = None
+_STATE_LOCK = threading.Lock()
+
+
+def current_state():
+    """The dataset version this process serves, loaded on first use."""
+    global _STATE
+    if _STATE is None:
+        with _STATE_LOCK:
+            if _STATE is None:
+                # Converts the CSV on first start or after it changed
+                with metrics.timed("store_build"):
+                    version_dir = store.ensure_store()
+                _STATE = DatasetState(os.path.basename(version_dir), read_dataset(version_dir))
+    return _STATE
+
+
+def swap_state(state):
+    """Serve ``state`` from now on (one reference assignment, so atomic)."""
+    global _STATE
+    _STATE = state
+
+
+def active_version():
+    """Column store version of the data being served."""
+    return current_state().version
+
+
+def range_version(year_range):
+    """Cache key part for results that depend only on rows within ``year_range``."""
+    return current_state().range_version(tuple(year_range))
+
+
+def _key_signatures(df):
+    """Per (country, year) hash of that key's rows, in file order."""
+    keys = pd.DataFrame({"country": df["country"].astype(str), "year": df["year"].astype(np.int64)})
+    occurrence = keys.groupby(["country", "year"], sort=False).cumcount()
+    values = df.drop(columns=["country", "year"]).assign(_occurrence=occurrence.to_numpy())
+    hashes = pd.util.hash_pandas_object(values, index=False)
+    # uint64 sums wrap around, which is fine for a signature
+    return hashes.groupby([keys["country"], keys["year"]]).sum()
+
+
+def changed_rows(old, new):
+    """DataFrame[country, year] of keys whose rows were added, removed or edited.
+
+    None when the columns differ, in which case nothing can be carried over.
+    """
+    if list(old.columns) != list(new.columns):
+        return None
+    old_signatures, new_signatures = _key_signatures(old), _key_signatures(new)
+    keys = old_signatures.index.union(new_signatures.index)
+    differs = (
+        old_signatures.reindex(keys, fill_value=0).to_numpy()
+        != new_signatures.reindex(keys, fill_value=0).to_numpy()
+    )
+    return keys[differs].to_frame(index=False)
+
+
+def next_state(current, version, frame):
+    """State for a newly loaded ``frame``, recording which years changed since ``current``."""
+    changed = changed_rows(current.frame, frame)
+    generation = current.generation + 1
+    if changed is None:
+        return DatasetState(version, frame, generation, base_generation=generation)
+    year_generations = dict(current.year_generations)
+    year_generations.update({int(year): generation for year in changed["year"].unique()})
+    return DatasetState(version, frame, generation, current.base_generation, year_generations,
+                        previous=current, changed=changed)
+
+
+def load_dataset():
+    """Return the shared dataset frame; callers must treat it as read-only."""
+    return current_state().frame
+
+
+def load_normalized_dataset(state=None):
+    """Shared dataset with every metric column already scaled to 0-1 shares."""
+    def build(state):
+        df = state.frame.copy(deep=False)
+        return normalize_columns(df, [c for c in df.columns if c not in ("country", "year")])
+
+    return (state or current_state()).derived("normalized", build)
+
+
+def get_columns(columns, normalized=False, state=None):
+    """Column subset of the shared frame without copying the underlying data.
+
+    With ``normalized=True`` metric columns come from the load-time normalized
+    frame, so callers don't need to rescale percentages themselves.  ``state``
+    selects a dataset version other than the one being served.
+    """
+    state = state or current_state()
+    df = load_normalized_dataset(state) if normalized else state.frame
+    return pd.DataFrame({column: df[column] for column in columns}, copy=False)
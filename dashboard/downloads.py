@@ -0,0 +1,33 @@
+"""Shared, cached payloads for the "Download Original Dataset" buttons.
+
+The CSV is read into one immutable ``bytes`` object per process (and per
+file version) rather than into a fresh string on every click in every
+session.  A gzip variant is built lazily the first time it is requested.
+"""
+
+import functools
+import gzip
+import os
+
+from dashboard.store import CSV_PATH
+
+
+@functools.lru_cache(maxsize=4)
+def _file_bytes(path, size, mtime_ns, compress):
+    with open(path, "rb") as f:
+        payload = f.read()
+    if compress:
+        # mtime=0 keeps the archive byte-identical across processes
+        payload = gzip.compress(payload, compresslevel=6, mtime=0)
+    return payload
+
+
+def dataset_bytes(path=CSV_PATH, compress=False):
+    """The file at ``path`` as cached bytes, gzip-compressed if ``compress``.
+
+    The cache is keyed on size and mtime, so a replaced file is picked up on
+    the next call.  Raises FileNotFoundError if the file is missing.
+    """
+    stat = os.stat(path)
+    return _file_bytes(path, stat.st_size, stat.st_mtime_ns, compress)
+
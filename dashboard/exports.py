@@ -0,0 +1,123 @@
+"""Process-wide cache of serialized export files.
+
+Export buttons used to rebuild their DataFrame and call ``to_csv`` on every
+click.  Exports are now keyed by their selection parameters, serialized once,
+and the bytes are shared by every session that asks for the same file.  The
+cache is an LRU bounded by total payload size.  Each format is produced
+lazily on first request, so Parquet/XLSX cost nothing unless someone
+downloads them.
+"""
+
+import collections
+import importlib.util
+import io
+import threading
+
+from dashboard import store
+
+MAX_BYTES = 64 * 1024 * 1024
+
+# format -> (label, mime type, file extension, module the pandas writer needs)
+FORMATS = {
+    "csv": ("CSV", "text/csv", "csv", None),
+    "parquet": ("Parquet", "application/vnd.apache.parquet", "parquet", "pyarrow"),
+    "xlsx": ("Excel", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx", "openpyxl"),
+}
+
+
+def available_formats():
+    """Formats whose optional writer dependency is installed."""
+    return [
+        fmt for fmt, (_, _, _, module) in FORMATS.items()
+        if module is None or importlib.util.find_spec(module) is not None
+    ]
+
+
+def serialize(df, fmt="csv"):
+    """``df`` as bytes in ``fmt`` (no index)."""
+    df = store.widen_floats(df)
+    if fmt == "csv":
+        return df.to_csv(index=False).encode("utf-8")
+    buffer = io.BytesIO()
+    if fmt == "parquet":
+        df.to_parquet(buffer, index=False)
+    elif fmt == "xlsx":
+        df.to_excel(buffer, index=False)
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+    return buffer.getvalue()
+
+
+class ExportCache:
+    """Thread-safe LRU of (payload bytes, row count) bounded by ``max_bytes``."""
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = collections.OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, build):
+        """Return the cached entry for ``key``, calling ``build()`` on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        # Build outside the lock; a concurrent miss on the same key just builds twice
+        entry = build()
+        payload_size = len(entry[0])
+        if payload_size > self.max_bytes:
+            return entry
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = entry
+                self._size += payload_size
+            while self._size > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+EXPORT_CACHE = ExportCache()
+
+
+def export_file(name, params, build_frame, fmt="csv", cache=EXPORT_CACHE):
+    """(payload bytes, row count) of export ``name`` for hashable ``params``.
+
+    ``build_frame()`` must return the export DataFrame and depend only on
+    ``params``; it runs only when the file isn't cached yet.
+    """
+    def build():
+        df = build_frame()
+        return serialize(df, fmt), len(df)
+
+    return cache.get((name, params, fmt), build)
+
+
+def file_name(stem, fmt):
+    return f"{stem}.{FORMATS[fmt][2]}"
+
+
+def mime_type(fmt):
+    return FORMATS[fmt][1]
@@ -0,0 +1,281 @@
+"""Cached, pre-simplified country geometry for the map page.
+
+``world-countries.json`` is parsed once per process.  Simplified variants are
+built TopoJSON-style: every ring is cut into arcs at junction points (where
+borders meet or a ring starts), shared arcs are stored once, and each arc is
+simplified once with Douglas-Peucker.  Neighbouring countries therefore keep
+identical borders at every resolution, with no gaps or overlaps.
+
+``get_geojson(zoom)`` picks the coarsest variant that still looks right at a
+given Leaflet zoom level.
+"""
+
+import functools
+import json
+import math
+import os
+import tempfile
+
+import numpy as np
+
+GEOJSON_PATH = "world-countries.json"
+CENTROID_CACHE = ".cache/geometry/centroids.json"
+
+# (highest zoom level, tolerance in degrees): roughly one screen pixel at that
+# zoom.  Beyond the last entry the full-resolution geometry is served.
+RESOLUTIONS = [(2, 0.5), (4, 0.1), (6, 0.02)]
+
+
+@functools.lru_cache(maxsize=None)
+def load_geojson(path=GEOJSON_PATH):
+    """Parsed GeoJSON FeatureCollection; shared, so treat it as read-only."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def tolerance_for_zoom(zoom):
+    """Simplification tolerance (degrees) suitable for a Leaflet zoom level."""
+    if zoom is None:
+        return RESOLUTIONS[0][1]
+    for max_zoom, tolerance in RESOLUTIONS:
+        if zoom <= max_zoom:
+            return tolerance
+    return 0.0
+
+
+def _polygons(geometry):
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    if geometry["type"] == "MultiPolygon":
+        return geometry["coordinates"]
+    return []
+
+
+def _junctions(features):
+    """Coordinates where a ring must be cut so shared borders become shared arcs."""
+    rings_at = {}
+    rings = []
+    for feature in features:
+        for polygon in _polygons(feature["geometry"]):
+            for ring in polygon:
+                points = [tuple(p) for p in ring[:-1]]
+                rings.append(points)
+                ring_id = len(rings)
+                for point in points:
+                    rings_at.setdefault(point, set()).add(ring_id)
+
+    junctions = set()
+    for points in rings:
+        if not points:
+            continue
+        junctions.add(points[0])
+        for i, point in enumerate(points):
+            # A change in which rings share a vertex marks where a border starts or ends
+            if rings_at[point] != rings_at[points[i - 1]] or rings_at[point] != rings_at[points[(i + 1) % len(points)]]:
+                junctions.add(point)
+    return junctions
+
+
+def _douglas_peucker(points, tolerance):
+    """Boolean mask of the vertices of ``points`` (n x 2) to keep."""
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        segment = points[last] - points[first]
+        offsets = points[first + 1:last] - points[first]
+        length = math.hypot(*segment)
+        if length == 0:
+            distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        else:
+            distances = np.abs(segment[0] * offsets[:, 1] - segment[1] * offsets[:, 0]) / length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = first + 1 + farthest
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+    return keep
+
+
+def _simplify_arc(chain, tolerance, decimals):
+    points = np.asarray(chain, dtype=np.float64)
+    if tolerance > 0 and len(points) > 2:
+        points = points[_douglas_peucker(points, tolerance)]
+    if decimals is not None:
+        points = np.round(points, decimals)
+    return points.tolist()
+
+
+def _ring_chains(ring, junctions):
+    """Split a closed ring into chains that start and end at junctions."""
+    points = [tuple(p) for p in ring[:-1]]
+    cuts = [i for i, point in enumerate(points) if point in junctions] or [0]
+    chains = []
+    for start, stop in zip(cuts, cuts[1:] + [cuts[0] + len(points)]):
+        chains.append([points[i % len(points)] for i in range(start, stop + 1)])
+    return chains
+
+
+def _canonical(chain):
+    """(chain in canonical direction, whether it was reversed)."""
+    chain = tuple(chain)
+    reverse = chain[::-1]
+    return (reverse, True) if reverse < chain else (chain, False)
+
+
+@functools.lru_cache(maxsize=None)
+def _topology(tolerance, path=GEOJSON_PATH):
+    """Shared arcs plus, per feature, the arc references of each ring."""
+    features = load_geojson(path)["features"]
+    junctions = _junctions(features)
+    decimals = max(2, math.ceil(-math.log10(tolerance)) + 1) if tolerance > 0 else None
+
+    arcs = []
+    arc_ids = {}
+    feature_arcs = []
+    for feature in features:
+        polygons = []
+        for polygon in _polygons(feature["geometry"]):
+            rings = []
+            for ring in polygon:
+                refs = []
+                for chain in _ring_chains(ring, junctions):
+                    key, reversed_ = _canonical(chain)
+                    if key not in arc_ids:
+                        arc_ids[key] = len(arcs)
+                        arcs.append(_simplify_arc(key, tolerance, decimals))
+                    refs.append(~arc_ids[key] if reversed_ else arc_ids[key])
+                if _ring_length(arcs, refs) < 4:
+                    # Simplified away entirely (small islands): keep it as drawn
+                    arcs.append(_simplify_arc(ring, 0.0, decimals))
+                    refs = [len(arcs) - 1]
+                rings.append(refs)
+            polygons.append(rings)
+        feature_arcs.append(polygons)
+    return arcs, feature_arcs
+
+
+def _ring_length(arcs, refs):
+    return 1 + sum(len(arcs[ref if ref >= 0 else ~ref]) - 1 for ref in refs)
+
+
+def _ring_coordinates(arcs, refs):
+    ring = []
+    for ref in refs:
+        arc = arcs[ref] if ref >= 0 else arcs[~ref][::-1]
+        ring.extend(arc if not ring else arc[1:])
+    return ring
+
+
+@functools.lru_cache(maxsize=None)
+def simplified_geojson(tolerance, path=GEOJSON_PATH):
+    """FeatureCollection with every border simplified to ``tolerance`` degrees."""
+    source = load_geojson(path)
+    if tolerance <= 0:
+        return source
+    arcs, feature_arcs = _topology(tolerance, path)
+    features = []
+    for feature, polygons in zip(source["features"], feature_arcs):
+        coordinates = [[_ring_coordinates(arcs, refs) for refs in rings] for rings in polygons]
+        geometry = {"type": feature["geometry"]["type"]}
+        geometry["coordinates"] = coordinates[0] if geometry["type"] == "Polygon" else coordinates
+        simplified = {k: v for k, v in feature.items() if k != "geometry"}
+        simplified["geometry"] = geometry
+        features.append(simplified)
+    return {"type": "FeatureCollection", "features": features}
+
+
+def get_geojson(zoom=None, path=GEOJSON_PATH):
+    """Shared GeoJSON at the resolution for ``zoom`` (coarsest when None).
+
+    The result is cached and shared between sessions: use ``with_properties``
+    rather than modifying features.
+    """
+    return simplified_geojson(tolerance_for_zoom(zoom), path)
+
+
+def with_properties(geojson, properties_by_name):
+    """New FeatureCollection with extra properties merged in per country name.
+
+    Geometries are shared with ``geojson``, not copied, so this is cheap
+    enough to run on every rerun.
+    """
+    features = []
+    for feature in geojson["features"]:
+        properties = dict(feature.get("properties") or {})
+        properties.update(properties_by_name.get(properties.get("name"), {}))
+        annotated = dict(feature)
+        annotated["properties"] = properties
+        features.append(annotated)
+    return {"type": "FeatureCollection", "features": features}
+
+
+def _ring_area_centroid(ring):
+    """Signed area and area-weighted centroid of a ring (planar lon/lat)."""
+    points = np.asarray(ring, dtype=np.float64)
+    x, y = points[:, 0], points[:, 1]
+    x_next, y_next = np.roll(x, -1), np.roll(y, -1)
+    cross = x * y_next - x_next * y
+    area = cross.sum() / 2
+    if area == 0:
+        return 0.0, points.mean(axis=0)
+    centroid = np.array([((x + x_next) * cross).sum(), ((y + y_next) * cross).sum()]) / (6 * area)
+    return area, centroid
+
+
+def _polygon_area_centroid(polygon):
+    """Area and centroid of an outer ring minus its holes."""
+    total_area = 0.0
+    weighted = np.zeros(2)
+    for i, ring in enumerate(polygon):
+        area, centroid = _ring_area_centroid(ring)
+        area = abs(area) if i == 0 else -abs(area)
+        total_area += area
+        weighted += area * centroid
+    if total_area <= 0:
+        return 0.0, np.asarray(polygon[0], dtype=np.float64).mean(axis=0)
+    return total_area, weighted / total_area
+
+
+def _compute_centroids(geojson):
+    centroids = {}
+    for feature in geojson["features"]:
+        polygons = [_polygon_area_centroid(p) for p in _polygons(feature["geometry"]) if p and p[0]]
+        if not polygons:
+            continue
+        # Largest polygon only, so overseas territories don't pull the bubble
+        # out to sea (France, United States, ...)
+        _, (lon, lat) = max(polygons, key=lambda item: item[0])
+        centroids[feature["properties"]["name"]] = (float(lat), float(lon))
+    return centroids
+
+
+@functools.lru_cache(maxsize=None)
+def country_centroids(path=GEOJSON_PATH, cache_path=CENTROID_CACHE):
+    """{country name: (lat, lon)} bubble anchor for every country in ``path``.
+
+    Cached in memory and on disk; the disk copy is reused while the GeoJSON
+    file's size and mtime are unchanged.
+    """
+    stat = os.stat(path)
+    source = {"path": os.path.abspath(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("source") == source:
+            return {name: tuple(latlon) for name, latlon in cached["centroids"].items()}
+    except (FileNotFoundError, ValueError, KeyError):
+        pass
+
+    centroids = _compute_centroids(load_geojson(path))
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump({"source": source, "centroids": centroids}, f)
+    os.replace(tmp_path, cache_path)
+    return centroids
+
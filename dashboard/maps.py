@@ -0,0 +1,199 @@
+"""World map construction shared by the map page and the snapshot build.
+
+``build_map`` turns (metric, map type, year range, zoom) into a folium Map;
+``map_from_data`` does the same from an already computed per-country frame
+and ranking.  The per-country layer data (values, ranks, colours, tooltips) goes through
+``render.RENDER_CACHE``, so building a map for a view that was already shown
+is mostly folium object construction.
+
+folium (and branca) are imported on first use: they are slow to import and
+not needed at all when a pre-rendered snapshot serves the first paint.
+"""
+
+import numpy as np
+import pandas as pd
+
+from dashboard import cube, data, geometry, metrics, ranking, render, trends
+
+# Map page metric labels -> value column
+METRIC_COLUMNS = {
+    "Completion Index": "completion_index",
+    "Attainment Index": "attainment_index",
+    "Higher Education Completion Index": "higher_ed_completion_index",
+    "Dropout Index": "dropout_index",
+    "Completion Trend": "completion_trend"
+}
+MAP_TYPES = ["Choropleth", "Circle Bubble"]
+DEFAULT_YEAR_RANGE = (2015, 2024)
+DEFAULT_ZOOM = 2
+
+COLOR_LIST = ["#800026", "#BD0026", "#E31A1C", "#FC4E2A", "#FD8D3C", "#FEB24C", "#FED976", "#FFEDA0"]
+
+
+def metric_data(value_column, year_range, timeout=trends.SLOPE_WAIT_SECONDS):
+    """(per-country frame, ranking, data version) behind ``value_column``.
+
+    Trend metrics are long-run slopes over all years from the background
+    slope table, so the year range doesn't apply to them and their data
+    version is the column store version.  For index metrics it is the
+    dataset's ``range_version`` of the year range.  Raises
+    ``trends.SlopeTablePending`` if the slope table isn't ready within
+    ``timeout`` seconds (None waits for it).
+    """
+    if value_column in trends.INDEX_TRENDS:
+        slope_table = trends.get_slope_table(timeout)
+        return slope_table["index_trends"], slope_table["rankings"][value_column], slope_table["version"]
+    # Rankings of every index for the selected years, computed once per year range
+    df_merged = cube.index_frame(year_range)
+    return df_merged, ranking.get_rankings(tuple(year_range))[value_column], data.range_version(year_range)
+
+
+def value_scale(df_merged, value_column):
+    """({country: finite value}, min, max) for the colour scale; None if < 2 values."""
+    value_dict = dict(zip(df_merged["country"], df_merged[value_column]))
+    value_dict = {k: float(v) for k, v in value_dict.items() if pd.notna(v) and np.isfinite(v)}
+
+    valid_values = sorted(value_dict.values())
+    if len(valid_values) < 2:
+        return None
+
+    min_val, max_val = valid_values[0], valid_values[-1]
+    if min_val == max_val:
+        min_val -= 0.01
+        max_val += 0.01
+    return value_dict, min_val, max_val
+
+
+def make_colormap(metric, value_column, min_val, max_val):
+    from branca.colormap import LinearColormap
+
+    # Lower is better for dropout: reverse the scheme
+    color_list = COLOR_LIST[::-1] if value_column == "dropout_index" else COLOR_LIST
+    colormap = LinearColormap(colors=color_list, vmin=min_val, vmax=max_val)
+    colormap.caption = f"{metric} (Scale: {round(min_val, 2)} — {round(max_val, 2)})"
+    return colormap
+
+
+def build_map(metric, map_type, year_range, zoom=DEFAULT_ZOOM, timeout=trends.SLOPE_WAIT_SECONDS):
+    """Folium Map of ``metric`` for ``year_range``; None if there is too little data.
+
+    Raises FileNotFoundError when the GeoJSON file is missing, and
+    ``trends.SlopeTablePending`` as ``metric_data`` does.
+    """
+    year_range = tuple(year_range)
+    df_merged, country_ranking, data_version = metric_data(METRIC_COLUMNS[metric], year_range, timeout)
+    return map_from_data(metric, map_type, df_merged, country_ranking, (year_range, data_version), zoom)
+
+
+def map_from_data(metric, map_type, df_merged, country_ranking, view_key, zoom=DEFAULT_ZOOM):
+    """Folium Map of ``metric`` from its per-country frame and ranking; None if too little data.
+
+    ``view_key`` identifies the data behind the frame (``build_map`` uses the
+    year range and data version) and keys the shared layer data in
+    ``render.RENDER_CACHE``.  Raises FileNotFoundError when the GeoJSON file
+    is missing.
+    """
+    import folium
+
+    value_column = METRIC_COLUMNS[metric]
+    scale = value_scale(df_merged, value_column)
+    if scale is None:
+        return None
+    value_dict, min_val, max_val = scale
+    colormap = make_colormap(metric, value_column, min_val, max_val)
+    ranking_dict = dict(zip(country_ranking["country"].tolist(), country_ranking["rank"].tolist()))
+
+    m = folium.Map(location=[0, 0], zoom_start=2, tiles='cartodbpositron')
+
+    # Parsed and simplified once per process
+    with metrics.timed("geojson"):
+        geojson = geometry.get_geojson(zoom=zoom)
+
+    if map_type == "Choropleth":
+        # One layer for every country: value, rank, colour and tooltip travel in
+        # the feature properties instead of one GeoJson layer per country
+        def build_choropleth_geojson():
+            feature_properties = {}
+            for feature in geojson["features"]:
+                country = feature["properties"]["name"]
+                value = value_dict.get(country)
+                rank = ranking_dict.get(country)
+
+                fill_color = colormap(value) if value is not None and np.isfinite(value) else "lightgray"
+
+                if rank == 1:
+                    tooltip_text = f"🥇 {country}<br>Rank: 1st<br>{metric}: {value:.3f}"
+                elif rank:
+                    tooltip_text = f"🏆 {country}<br>Rank: {rank}<br>{metric}: {value:.3f}"
+                else:
+                    tooltip_text = f"❓ {country}<br>No data available"
+
+                feature_properties[country] = {
+                    "value": value,
+                    "rank": rank,
+                    "fill_color": fill_color,
+                    "tooltip": tooltip_text
+                }
+            return geometry.with_properties(geojson, feature_properties)
+
+        # Annotated GeoJSON is built once per view and shared (read-only)
+        choropleth_geojson = render.RENDER_CACHE.get(
+            ("choropleth", metric, view_key, geometry.tolerance_for_zoom(zoom)),
+            build_choropleth_geojson
+        )
+
+        folium.GeoJson(
+            choropleth_geojson,
+            name=metric,
+            style_function=lambda x: {
+                "fillOpacity": 0.7,
+                "weight": 0.3,
+                "color": "black",
+                "fillColor": x["properties"]["fill_color"]
+            },
+            highlight_function=lambda x: {
+                "weight": 2,
+                "fillOpacity": 0.85,
+                "color": "green" if x["properties"]["rank"] == 1 else "blue"
+            },
+            tooltip=folium.GeoJsonTooltip(fields=["tooltip"], labels=False)
+        ).add_to(m)
+
+    elif map_type == "Circle Bubble":
+        def build_bubbles():
+            # Bubble anchors: largest-polygon centroids, computed once and cached on disk
+            centroids = geometry.country_centroids()
+            bubbles = []
+            for country, value in value_dict.items():
+                location = centroids.get(country)
+                if not location or not value:
+                    continue
+
+                radius = 10 + 20 * (value - min_val) / (max_val - min_val)
+                rank = ranking_dict.get(country)
+
+                if rank == 1:
+                    tooltip_text = f"🥇 {country}<br>Rank: 1st<br>{metric}: {value:.3f}"
+                else:
+                    tooltip_text = f"🏆 {country}<br>Rank: {rank}<br>{metric}: {value:.3f}"
+
+                bubbles.append((location, radius, colormap(value), tooltip_text))
+            return bubbles
+
+        # Marker positions, sizes, colours and tooltips are built once per view
+        bubbles = render.RENDER_CACHE.get(("bubbles", metric, view_key), build_bubbles)
+        for location, radius, fill_color, tooltip_text in bubbles:
+            folium.CircleMarker(
+                location=list(location),
+                radius=radius,
+                color="black",
+                fill=True,
+                fill_color=fill_color,
+                fill_opacity=0.8,
+                weight=1,
+                tooltip=tooltip_text
+            ).add_to(m)
+
+    colormap.add_to(m)
+    folium.LayerControl().add_to(m)
+    return m
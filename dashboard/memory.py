@@ -0,0 +1,162 @@
+"""Memory breakdown of the shared dataset, before and after dtype compaction.
+
+    python -m dashboard.memory                  # per-column table and totals
+    python -m dashboard.memory --json memory.json
+
+"Before" is the dataset as the pages used to load it: ``pd.read_csv`` with
+float64 metrics, a float64 ``year`` after ``pd.to_numeric``, object
+``country`` and object region columns.  "After" is what the dashboard holds
+now.  Metrics are float32, ``year`` is int16 and ``country`` and the region
+columns are categoricals from the column store.  The index cube's integer
+arrays are int32/int16.
+
+The report also runs every index, regional average and trend fit on both
+versions and prints the largest difference.  The check fails unless all of
+them agree within ``RTOL``/``ATOL``.
+"""
+
+import argparse
+import json
+
+import numpy as np
+import pandas as pd
+
+from dashboard import cube, data, regional, store, trends
+
+RTOL = 1e-5
+ATOL = 1e-6
+CHECK_YEAR_RANGES = [(2000, 2024), (2010, 2020), (2015, 2024), (2020, 2024)]
+
+
+def column_memory(df):
+    """{column: (dtype, bytes)} including object/string payloads."""
+    usage = df.memory_usage(deep=True, index=False)
+    return {column: (str(df[column].dtype), int(usage[column])) for column in df.columns}
+
+
+def legacy_frames():
+    """(dataset, regional frame) with the dtypes the pages used to load."""
+    available = set(store.store_columns())
+    columns = data.DATASET_COLUMNS + [c for c in data.OPTIONAL_COLUMNS if c in available]
+    df = pd.read_csv(store.CSV_PATH, usecols=columns)[columns]
+    df["year"] = pd.to_numeric(df["year"], errors="coerce")
+    df = df.dropna(subset=store.KEY_COLUMNS).reset_index(drop=True)
+    df["country"] = data.normalize_country_names(df["country"]).astype(object)
+
+    regional_columns = list(regional.regional_frame().columns)
+    df_regional = df.copy()
+    metric_columns = [c for c in df_regional.columns if c not in ("country", "year")]
+    df_regional[metric_columns] = df_regional[metric_columns].where(
+        df_regional[metric_columns] <= 1.0, df_regional[metric_columns] / 100
+    )
+    for region_col in data.REGION_GROUPINGS:
+        df_regional[region_col] = data.assign_regions(df_regional["country"], region_col).astype(object)
+    return df, df_regional[regional_columns]
+
+
+def _cube_legacy_bytes(index_cube):
+    # The same arrays with 8-byte integers, as before compaction
+    tables = (index_cube._prefix_sums, index_cube._prefix_counts, index_cube._latest_values, index_cube._latest_year)
+    return sum(a.size * (8 if a.dtype.kind in "iu" else a.itemsize) for table in tables for a in table.values())
+
+
+def memory_report():
+    """DataFrame[object, column, dtype/bytes before and after], one row per column."""
+    before_dataset, before_regional = legacy_frames()
+    rows = []
+    for name, before, after in (
+        ("dataset", before_dataset, data.load_dataset()),
+        ("regional_frame", before_regional, regional.regional_frame()),
+    ):
+        before_usage, after_usage = column_memory(before), column_memory(after)
+        for column in after.columns:
+            rows.append((name, column, *before_usage[column], *after_usage[column]))
+    index_cube = cube.get_cube()
+    rows.append(("index_cube", "(arrays)", "int64/float64", _cube_legacy_bytes(index_cube),
+                 "int32/int16/float64", index_cube.nbytes()))
+    return pd.DataFrame(rows, columns=["object", "column", "before_dtype", "before_bytes", "after_dtype", "after_bytes"])
+
+
+def _difference(before, after):
+    """(max abs difference, same relative to the RTOL/ATOL band; <= 1 is within it)."""
+    before = np.asarray(before, dtype=np.float64)
+    after = np.asarray(after, dtype=np.float64)
+    if before.shape != after.shape or not np.array_equal(np.isnan(before), np.isnan(after)):
+        return np.inf, np.inf
+    both = ~np.isnan(before)
+    if not both.any():
+        return 0.0, 0.0
+    diff = np.abs(before[both] - after[both])
+    return float(diff.max()), float(np.max(diff / (ATOL + RTOL * np.abs(before[both]))))
+
+
+def compare_results(year_ranges=CHECK_YEAR_RANGES):
+    """{computation: (max abs difference, within tolerance)} for compact vs legacy dtypes."""
+    before_dataset, before_regional = legacy_frames()
+    before_cube = cube.IndexCube(before_dataset)
+    after_cube = cube.get_cube()
+    after_regional = regional.regional_frame()
+    after_dataset = data.load_dataset()
+
+    results = {}  # name -> (max abs difference, max scaled difference)
+
+    def record(name, before, after):
+        diff, scaled = _difference(before, after)
+        worst_diff, worst_scaled = results.get(name, (0.0, 0.0))
+        results[name] = (max(worst_diff, diff), max(worst_scaled, scaled))
+
+    for year_range in year_ranges:
+        before_frame = before_cube.index_frame(year_range).set_index("country")
+        after_frame = after_cube.index_frame(year_range).set_index("country")
+        for column in cube.INDEX_COLUMNS:
+            record(f"index:{column}", before_frame[column], after_frame[column].reindex(before_frame.index))
+
+        for region_col in data.REGION_GROUPINGS:
+            for metric, metric_cols in regional.METRIC_OPTIONS.items():
+                args = (region_col, metric_cols, regional.average_column(metric), year_range)
+                before_avg = regional.calculate_regional_averages(before_regional, *args)
+                after_avg = regional.calculate_regional_averages(after_regional, *args)
+                record(f"regional:{metric}", before_avg[args[2]], after_avg[args[2]])
+
+        for column in [c for c in trends.TREND_COLUMNS if c in after_dataset.columns]:
+            fits = []
+            for df in (before_dataset, after_dataset):
+                in_range = df["year"].between(*year_range).to_numpy()
+                fits.append(trends.fit_trends(df["country"][in_range], df["year"].to_numpy()[in_range],
+                                              df[column].to_numpy()[in_range])["slope"])
+            record(f"trend:{column}", fits[0], fits[1].reindex(fits[0].index))
+
+    return {name: (diff, scaled <= 1.0) for name, (diff, scaled) in results.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memory before/after dtype compaction, with a results check.")
+    parser.add_argument("--json", help="also write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    report = memory_report()
+    pd.set_option("display.width", 200)
+    print(report.to_string(index=False))
+    totals = report.groupby("object", sort=False)[["before_bytes", "after_bytes"]].sum()
+    totals.loc["total"] = totals.sum()
+    totals["saved"] = 1 - totals["after_bytes"] / totals["before_bytes"]
+    print()
+    print(totals.to_string(formatters={"saved": "{:.0%}".format}))
+
+    comparison = compare_results()
+    print()
+    for name, (diff, ok) in comparison.items():
+        print(f"{'ok  ' if ok else 'FAIL'} {name:<40} max abs difference {diff:.2e}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "columns": report.to_dict(orient="records"),
+                "comparison": {name: {"max_abs_difference": diff, "ok": ok} for name, (diff, ok) in comparison.items()},
+            }, f, indent=2)
+    if not all(ok for _, ok in comparison.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
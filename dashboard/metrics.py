@@ -0,0 +1,196 @@
+"""Per-stage timing, allocation and cache metrics for the dashboard.
+
+Wrap a stage in ``with metrics.timed("stage"):`` to record its call count,
+total, last and max wall time in the process-wide ``METRICS`` registry.
+When ``DASHBOARD_TRACE_ALLOC=1`` is set, tracemalloc runs for the whole
+process and each stage also records the net bytes it allocated.  That costs
+noticeable CPU, so it is off by default.
+
+Cache hit/miss counters are read live from the shared caches (render and
+export LRUs and the ``functools.lru_cache`` helpers), so they cost nothing
+until someone looks.  The same goes for the bytes held by the dataset frame
+and the frames derived from it.  ``to_json()`` and ``to_prometheus()``
+export everything.  ``debug_panel()`` shows it in the sidebar when the page
+is opened with ``?debug=1`` or ``DASHBOARD_DEBUG=1`` is set.
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+TRACE_ALLOCATIONS = os.environ.get("DASHBOARD_TRACE_ALLOC") == "1"
+if TRACE_ALLOCATIONS and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+
+class StageMetrics:
+    """Thread-safe per-stage counters."""
+
+    def __init__(self):
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds, allocated=None):
+        with self._lock:
+            entry = self._stages.setdefault(stage, {
+                "calls": 0, "total_seconds": 0.0, "max_seconds": 0.0, "last_seconds": 0.0,
+                "allocated_bytes": None,
+            })
+            entry["calls"] += 1
+            entry["total_seconds"] += seconds
+            entry["max_seconds"] = max(entry["max_seconds"], seconds)
+            entry["last_seconds"] = seconds
+            if allocated is not None:
+                entry["allocated_bytes"] = (entry["allocated_bytes"] or 0) + allocated
+
+    @contextlib.contextmanager
+    def timed(self, stage):
+        """Record the wall time (and allocations, if traced) of the ``with`` body."""
+        tracing = tracemalloc.is_tracing()
+        before = tracemalloc.get_traced_memory()[0] if tracing else None
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            allocated = tracemalloc.get_traced_memory()[0] - before if tracing else None
+            self.record(stage, seconds, allocated)
+
+    def stages(self):
+        with self._lock:
+            return {stage: dict(entry) for stage, entry in self._stages.items()}
+
+    def clear(self):
+        with self._lock:
+            self._stages.clear()
+
+
+METRICS = StageMetrics()
+timed = METRICS.timed
+
+
+def cache_stats():
+    """{cache name: {"hits", "misses", "entries"}} for the shared caches."""
+    # Imported here: these modules import this one to time their stages
+    from dashboard import exports, geometry, ranking, regional, render, trends
+
+    stats = {}
+    for name, cache in (("render", render.RENDER_CACHE), ("exports", exports.EXPORT_CACHE)):
+        cache_info = cache.stats()
+        stats[name] = {"hits": cache_info["hits"], "misses": cache_info["misses"], "entries": cache_info["entries"]}
+    for name, func in (
+        ("rankings", ranking._rankings),
+        ("regional_averages", regional._regional_averages),
+        ("country_trends", trends._country_trends),
+        ("percentile_band", trends._percentile_band),
+        ("geojson", geometry.simplified_geojson),
+    ):
+        info = func.cache_info()
+        stats[name] = {"hits": info.hits, "misses": info.misses, "entries": info.currsize}
+    return stats
+
+
+def dataset_memory(state):
+    """{name: bytes} of the dataset frame and the derived objects built so far."""
+    memory = {"dataset": int(state.frame.memory_usage(deep=True).sum())}
+    for name in ("normalized", "regional_frame"):
+        frame = state.cached(name)
+        if frame is not None:
+            memory[name] = int(frame.memory_usage(deep=True).sum())
+    index_cube = state.cached("index_cube")
+    if index_cube is not None:
+        memory["index_cube"] = index_cube.nbytes()
+    return memory
+
+
+def snapshot():
+    from dashboard import data
+
+    state = data.current_state()
+    return {
+        "stages": METRICS.stages(),
+        "caches": cache_stats(),
+        "dataset": {"version": state.version, "generation": state.generation},
+        "memory": dataset_memory(state),
+        "trace_allocations": tracemalloc.is_tracing(),
+    }
+
+
+def to_json():
+    return json.dumps(snapshot(), indent=2)
+
+
+def to_prometheus():
+    """Metrics in the Prometheus text exposition format."""
+    current = snapshot()
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+            lines.append(f"{name}{{{label_text}}} {value}")
+
+    stages = current["stages"].items()
+    metric("dashboard_stage_calls_total", "counter", "Times each stage ran.",
+           [({"stage": s}, e["calls"]) for s, e in stages])
+    metric("dashboard_stage_seconds_total", "counter", "Wall time spent in each stage.",
+           [({"stage": s}, e["total_seconds"]) for s, e in stages])
+    metric("dashboard_stage_seconds_max", "gauge", "Slowest single run of each stage.",
+           [({"stage": s}, e["max_seconds"]) for s, e in stages])
+    metric("dashboard_stage_allocated_bytes_total", "counter", "Net bytes allocated by each stage (traced only).",
+           [({"stage": s}, e["allocated_bytes"]) for s, e in stages if e["allocated_bytes"] is not None])
+
+    caches = current["caches"].items()
+    metric("dashboard_cache_hits_total", "counter", "Cache hits.", [({"cache": c}, e["hits"]) for c, e in caches])
+    metric("dashboard_cache_misses_total", "counter", "Cache misses.", [({"cache": c}, e["misses"]) for c, e in caches])
+    metric("dashboard_cache_entries", "gauge", "Entries currently cached.",
+           [({"cache": c}, e["entries"]) for c, e in caches])
+    metric("dashboard_dataset_memory_bytes", "gauge", "Bytes held by the dataset and its derived frames.",
+           [({"object": o}, b) for o, b in current["memory"].items()])
+    return "\n".join(lines) + "\n"
+
+
+def debug_enabled():
+    import streamlit as st
+
+    return os.environ.get("DASHBOARD_DEBUG") == "1" or st.query_params.get("debug") == "1"
+
+
+def debug_panel():
+    """Sidebar expander with stage timings, cache counters, memory and export buttons."""
+    import pandas as pd
+    import streamlit as st
+
+    if not debug_enabled():
+        return
+
+    with st.sidebar.expander("🛠️ **Performance Metrics**"):
+        stages = METRICS.stages()
+        if stages:
+            st.dataframe(pd.DataFrame([
+                {
+                    "Stage": stage,
+                    "Calls": entry["calls"],
+                    "Last (ms)": round(entry["last_seconds"] * 1000, 1),
+                    "Max (ms)": round(entry["max_seconds"] * 1000, 1),
+                    "Total (s)": round(entry["total_seconds"], 3),
+                    "Allocated (MB)": round(entry["allocated_bytes"] / 2**20, 2) if entry["allocated_bytes"] is not None else None,
+                }
+                for stage, entry in stages.items()
+            ]), hide_index=True)
+        st.dataframe(pd.DataFrame([
+            {"Cache": name, **counts} for name, counts in cache_stats().items()
+        ]), hide_index=True)
+        from dashboard import data
+
+        st.dataframe(pd.DataFrame([
+            {"Data": name, "Memory (MB)": round(size / 2**20, 3)}
+            for name, size in dataset_memory(data.current_state()).items()
+        ]), hide_index=True)
+        st.download_button("💾 Metrics JSON", to_json(), file_name="dashboard_metrics.json", mime="application/json")
+        st.download_button("💾 Prometheus", to_prometheus(), file_name="dashboard_metrics.prom", mime="text/plain")
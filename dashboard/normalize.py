@@ -0,0 +1,40 @@
+"""Vectorized percentage normalization.
+
+Source metrics mix 0-1 shares and 0-100 percentages.  Everything above 1.0 is
+treated as a percentage and scaled down; NaN stays NaN.  This replaces the
+per-cell ``x / 100 if pd.notna(x) and x > 1.0 else x`` lambdas.
+"""
+
+import numpy as np
+
+
+def normalize_percentages(values, out=None):
+    """Return ``values`` with entries above 1.0 divided by 100.
+
+    Pass ``out=values`` to scale a float array in place.
+    """
+    values = np.asarray(values)
+    if out is None:
+        out = values.astype(np.result_type(values.dtype, np.float32), copy=True)
+    elif out is not values:
+        out[...] = values
+    np.divide(out, 100, out=out, where=out > 1.0)
+    return out
+
+
+def normalize_columns(df, columns):
+    """Normalize ``columns`` of ``df`` in one pass, replacing them in ``df``.
+
+    Only ``df``'s own column references change, so frames sharing data with
+    ``df`` (e.g. column views of the shared dataset) are left untouched.
+    """
+    columns = list(columns)
+    if not columns:
+        return df
+    dtype = np.result_type(np.float32, *[df[column].dtype for column in columns])
+    # Column-major so each normalized column is a contiguous slice
+    block = np.asfortranarray(df[columns].to_numpy(dtype=dtype, copy=True))
+    normalize_percentages(block, out=block)
+    for i, column in enumerate(columns):
+        df[column] = block[:, i]
+    return df
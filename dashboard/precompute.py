@@ -0,0 +1,230 @@
+"""Every year range of the map indices and regional averages, computed ahead.
+
+Run offline after the data changes::
+
+    python -m dashboard.precompute              # one worker per CPU
+    python -m dashboard.precompute --workers 4
+
+The year sliders can only produce integer (start, end) pairs within the
+dataset's span, so the builder computes the map's per-country index frame
+(``df_merged``) and the Regional Comparison averages for every pair, spread
+over a process pool.  Results go to ``PRECOMPUTE_DIR/<column store
+version>/``: one float64 ``.npy`` array per table, indexed by
+[year pair, country or region, column], next to a ``manifest.json`` with the
+row and column labels.  Readers memory-map the arrays, so a slider position
+becomes a slice instead of a computation.
+
+``cube.index_frame`` and ``regional.regional_averages`` read from here when
+a table for the served data version exists, and compute as before otherwise
+(no table yet, stale data, or a year range outside the dataset).
+"""
+
+import argparse
+import concurrent.futures
+import functools
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from dashboard import cube, data, regional
+
+PRECOMPUTE_DIR = ".cache/precomputed"
+
+
+def year_pairs(first_year, last_year):
+    """All (start, end) pairs with first_year <= start <= end <= last_year, in table order."""
+    return [(start, end) for start in range(first_year, last_year + 1) for end in range(start, last_year + 1)]
+
+
+def pair_index(year_range, first_year, last_year):
+    """Row of ``year_range`` in a table built by ``year_pairs``; None if outside it."""
+    start, end = int(year_range[0]), int(year_range[1])
+    if not first_year <= start <= end <= last_year:
+        return None
+    n_years = last_year - first_year + 1
+    offset = start - first_year
+    return offset * n_years - offset * (offset - 1) // 2 + (end - start)
+
+
+def _region_table_name(region_col, metric):
+    return f"regional_{region_col}_{regional.average_column(metric)}.npy"
+
+
+# Worker tasks: each computes every range starting at one year
+
+def _index_rows(start):
+    """(start, [end, country, column] values) of the unfiltered index frames."""
+    index_cube = cube.get_cube()
+    rows = [
+        index_cube.index_frame((start, end), drop_empty=False).drop(columns="country").to_numpy(dtype=np.float64)
+        for end in range(start, index_cube.last_year + 1)
+    ]
+    return start, np.stack(rows)
+
+
+def _regional_rows(region_col, start, last_year):
+    """(region_col, start, {metric: [end, region, column]}, [end, region] presence)."""
+    df = regional.regional_frame()
+    regions = df[region_col].astype("category").cat.categories
+    tables = {metric: [] for metric in regional.METRIC_OPTIONS}
+    present = []
+    for end in range(start, last_year + 1):
+        for metric, metric_cols in regional.METRIC_OPTIONS.items():
+            averages = regional.calculate_regional_averages(
+                df, region_col, metric_cols, regional.average_column(metric), (start, end)
+            ).set_index(region_col).reindex(regions)
+            tables[metric].append(averages.to_numpy(dtype=np.float64))
+        # The live computation keeps regions with at least one row in the range
+        present.append(regions.isin(df.loc[df["year"].between(start, end), region_col].unique()))
+    return region_col, start, {m: np.stack(t) for m, t in tables.items()}, np.stack(present)
+
+
+def build(workers=None, precompute_dir=PRECOMPUTE_DIR):
+    """Compute every table for the served dataset version; return the version directory."""
+    version = data.active_version()
+    version_dir = os.path.join(precompute_dir, version)
+    if os.path.exists(os.path.join(version_dir, "manifest.json")):
+        return version_dir
+
+    index_cube = cube.get_cube()
+    index_years = (index_cube.first_year, index_cube.last_year)
+    df = regional.regional_frame()
+    region_years = (int(df["year"].min()), int(df["year"].max()))
+
+    region_parts = {region_col: {} for region_col in regional.REGION_TYPES.values()}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        index_futures = [pool.submit(_index_rows, start) for start in range(index_years[0], index_years[1] + 1)]
+        region_futures = [
+            pool.submit(_regional_rows, region_col, start, region_years[1])
+            for region_col in region_parts
+            for start in range(region_years[0], region_years[1] + 1)
+        ]
+        index_parts = dict(future.result() for future in index_futures)
+        for future in region_futures:
+            region_col, start, tables, present = future.result()
+            region_parts[region_col][start] = (tables, present)
+
+    os.makedirs(precompute_dir, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=precompute_dir, prefix=".build-")
+    # Parts are stacked in start-year order, which is the ``year_pairs`` order
+    np.save(os.path.join(tmp_dir, "index_frames.npy"), np.concatenate([index_parts[s] for s in sorted(index_parts)]))
+    manifest = {
+        "source": version,
+        "index": {
+            "years": index_years,
+            "countries": [str(c) for c in index_cube.countries],
+            "columns": [c for c in index_cube.index_frame(index_years, drop_empty=False).columns if c != "country"],
+        },
+        "regional": {"years": region_years, "region_columns": {}},
+    }
+    for region_col, parts in region_parts.items():
+        starts = sorted(parts)
+        np.save(os.path.join(tmp_dir, f"regional_{region_col}_present.npy"),
+                np.concatenate([parts[s][1] for s in starts]))
+        for metric in regional.METRIC_OPTIONS:
+            np.save(os.path.join(tmp_dir, _region_table_name(region_col, metric)),
+                    np.concatenate([parts[s][0][metric] for s in starts]))
+        manifest["regional"]["region_columns"][region_col] = [
+            str(r) for r in df[region_col].astype("category").cat.categories
+        ]
+    with open(os.path.join(tmp_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+
+    try:
+        os.rename(tmp_dir, version_dir)
+    except OSError:
+        # Another build of the same version won the race
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    for entry in os.listdir(precompute_dir):
+        path = os.path.join(precompute_dir, entry)
+        if entry != version and os.path.isdir(path) and not entry.startswith(".build-"):
+            shutil.rmtree(path, ignore_errors=True)
+    return version_dir
+
+
+class PrecomputedTables:
+    """Read access to one built version directory (arrays are memory-mapped)."""
+
+    def __init__(self, version_dir, manifest):
+        self.version_dir = version_dir
+        self.manifest = manifest
+        index = manifest["index"]
+        self.countries = pd.Index(index["countries"], name="country")
+        self.index_columns = index["columns"]
+        self._arrays = {}
+
+    def _array(self, name):
+        if name not in self._arrays:
+            self._arrays[name] = np.load(os.path.join(self.version_dir, name), mmap_mode="r")
+        return self._arrays[name]
+
+    def index_frame(self, year_range):
+        """Same frame as ``IndexCube.index_frame``; None if the range isn't in the table."""
+        row = pair_index(year_range, *self.manifest["index"]["years"])
+        if row is None:
+            return None
+        values = np.array(self._array("index_frames.npy")[row])
+        df = pd.DataFrame(values, columns=self.index_columns)
+        df.insert(0, "country", self.countries)
+        return df.dropna(subset=list(cube.INDEX_COLUMNS), how="all").reset_index(drop=True)
+
+    def regional_averages(self, region_col, metric, year_range):
+        """Same frame as ``regional.calculate_regional_averages``; None if not in the table."""
+        regions = self.manifest["regional"]["region_columns"].get(region_col)
+        row = pair_index(year_range, *self.manifest["regional"]["years"])
+        if regions is None or row is None or metric not in regional.METRIC_OPTIONS:
+            return None
+        present = np.asarray(self._array(f"regional_{region_col}_present.npy")[row])
+        values = np.array(self._array(_region_table_name(region_col, metric))[row][present])
+        columns = regional.METRIC_OPTIONS[metric] + [regional.average_column(metric)]
+        df = pd.DataFrame(values, columns=columns)
+        df.insert(0, region_col, pd.Index(regions)[present])
+        return df
+
+
+@functools.lru_cache(maxsize=2)
+def _load(version_dir, mtime_ns):
+    with open(os.path.join(version_dir, "manifest.json"), "r", encoding="utf-8") as f:
+        return PrecomputedTables(version_dir, json.load(f))
+
+
+def load(precompute_dir=PRECOMPUTE_DIR):
+    """Tables built from the served dataset version, or None if there are none."""
+    version_dir = os.path.join(precompute_dir, data.active_version())
+    try:
+        return _load(version_dir, os.stat(os.path.join(version_dir, "manifest.json")).st_mtime_ns)
+    except (FileNotFoundError, ValueError, KeyError):
+        return None
+
+
+def index_frame(year_range):
+    """Precomputed index frame for ``year_range``, or None."""
+    tables = load()
+    return tables.index_frame(year_range) if tables is not None else None
+
+
+def regional_averages(region_col, metric, year_range):
+    """Precomputed regional averages for ``year_range``, or None."""
+    tables = load()
+    return tables.regional_averages(region_col, metric, year_range) if tables is not None else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute every year range of the map indices and regional averages.")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--out", default=PRECOMPUTE_DIR, help=f"output directory (default {PRECOMPUTE_DIR})")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    version_dir = build(args.workers, args.out)
+    size = sum(os.path.getsize(os.path.join(version_dir, name)) for name in os.listdir(version_dir))
+    print(f"Precomputed tables in {version_dir} ({size / 2**20:.1f} MB) in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
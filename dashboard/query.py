@@ -0,0 +1,161 @@
+"""Headless queries over the dashboard's indices, rankings and regional data.
+
+    python -m dashboard.query indices --year-range 2015 2024 --format parquet --out indices.parquet
+    python -m dashboard.query rankings --metric "Dropout Index" --format json
+    python -m dashboard.query regional-comparison --metric "Attainment Index" --region-type "Economic Regions"
+
+Each query returns the DataFrame behind the matching page view or export
+button, computed by the same cached functions the pages use (the export
+buttons call these functions), so batch jobs get the same numbers as the UI
+without a Streamlit session.  Output goes to stdout unless ``--out`` is
+given; Parquet needs pyarrow.
+"""
+
+import argparse
+import sys
+
+from dashboard import cube, data, exports, maps, regional, store
+
+OUTPUT_FORMATS = ["csv", "json", "parquet"]
+
+
+def index_frame(year_range):
+    """One row per country: sub-metric means and all four map indices."""
+    return cube.index_frame(year_range)
+
+
+def country_rankings(metric, year_range):
+    """Map page "Export Country Rankings": Rank, Country, ``metric``."""
+    value_column = maps.METRIC_COLUMNS[metric]
+    # Waits for the trend slope table (the Map page has it before exporting)
+    _, country_ranking, _ = maps.metric_data(value_column, tuple(year_range), timeout=None)
+    return country_ranking[["rank", "country", value_column]].rename(columns={
+        "rank": "Rank",
+        "country": "Country",
+        value_column: metric
+    })
+
+
+def regional_stats(metric, year_range):
+    """Map page "Export Regional Stats": summary of ``metric`` per geographic region."""
+    value_column = maps.METRIC_COLUMNS[metric]
+    df_merged, _, _ = maps.metric_data(value_column, tuple(year_range), timeout=None)
+    df_regional = df_merged[["country", value_column]].dropna().copy()
+    df_regional["Region"] = data.assign_regions(df_regional["country"], "geographic_region")
+
+    stats = df_regional.groupby("Region", observed=True)[value_column].agg(['mean', 'min', 'max', 'std', 'count']).reset_index()
+    return stats.rename(columns={
+        "Region": "Geographic Region",
+        value_column: metric,
+        "mean": "Average",
+        "min": "Minimum",
+        "max": "Maximum",
+        "std": "Standard Deviation",
+        "count": "Number of Countries"
+    })
+
+
+def trend_series(column, year_range, countries=None):
+    """Trendline data: country, year and ``column`` for the rows that have a value.
+
+    Values are normalized percentages (0-100), the scale of the Trendline
+    chart and of ``trends.country_trends``.
+    """
+    df = data.get_columns(["country", "year", column], normalized=True)
+    rows = df["year"].between(*year_range) & df[column].notna()
+    if countries:
+        rows &= df["country"].isin(countries)
+    df = df.loc[rows].reset_index(drop=True)
+    df[column] = df[column] * 100
+    return df
+
+
+def regional_comparison(metric, region_type, year_range):
+    """Regional Comparison "Export Regional Data": regions ranked by ``metric``."""
+    region_col = regional.REGION_TYPES[region_type]
+    average_col = regional.average_column(metric)
+    # Cached and shared, so filter into a new frame
+    regional_data = regional.regional_averages(region_col, metric, tuple(year_range))
+    regional_data = regional_data[regional_data[region_col] != data.OTHER_REGION]
+
+    export_data = regional_data[[region_col, average_col]].sort_values(average_col, ascending=False)
+    export_data.insert(0, "Rank", range(1, len(export_data) + 1))
+    return export_data.rename(columns={
+        region_col: region_type.replace(" Regions", ""),
+        average_col: f"{metric} Average"
+    })
+
+
+def country_data_by_region(metric, region_type, year_range):
+    """Regional Comparison "Export Country Data by Region": per-row ``metric`` averages."""
+    region_col = regional.REGION_TYPES[region_type]
+    average_col = regional.average_column(metric)
+    metric_cols = regional.METRIC_OPTIONS[metric]
+    df = regional.regional_frame()
+
+    # Only the exported columns are copied (values are already 0-1 shares)
+    df_detailed = df.loc[df["year"].between(*year_range), ["country", region_col] + metric_cols].copy()
+    df_detailed[average_col] = df_detailed[metric_cols].mean(axis=1)
+    df_detailed = df_detailed[df_detailed[region_col] != data.OTHER_REGION]
+    df_detailed = df_detailed.dropna(subset=[average_col])
+
+    region_label = region_type.replace(" Regions", "")
+    df_export = df_detailed[["country", region_col, average_col]].rename(columns={
+        "country": "Country",
+        region_col: region_label,
+        average_col: f"{metric} Average"
+    })
+    return df_export.sort_values([region_label, f"{metric} Average"], ascending=[True, False])
+
+
+# query name -> (function, metric choices or None, takes a region type)
+QUERIES = {
+    "indices": (index_frame, None, False),
+    "rankings": (country_rankings, maps.METRIC_COLUMNS, False),
+    "regional-stats": (regional_stats, maps.METRIC_COLUMNS, False),
+    "regional-comparison": (regional_comparison, regional.METRIC_OPTIONS, True),
+    "country-data-by-region": (country_data_by_region, regional.METRIC_OPTIONS, True),
+}
+
+
+def run_query(name, year_range, metric=None, region_type=None):
+    """DataFrame of query ``name`` (see ``QUERIES``) for ``year_range``."""
+    func, metrics, by_region = QUERIES[name]
+    args = ([metric] if metrics is not None else []) + ([region_type] if by_region else [])
+    return func(*args, tuple(year_range))
+
+
+def serialize(df, fmt):
+    """``df`` as bytes in one of ``OUTPUT_FORMATS``."""
+    if fmt == "json":
+        return store.widen_floats(df).to_json(orient="records", force_ascii=False).encode("utf-8")
+    return exports.serialize(df, fmt)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute dashboard indices, rankings and regional aggregates.")
+    parser.add_argument("query", choices=list(QUERIES))
+    parser.add_argument("--metric", default="Completion Index", help="index label as shown in the dashboard")
+    parser.add_argument("--region-type", default="Geographic Regions", choices=list(regional.REGION_TYPES))
+    parser.add_argument("--year-range", nargs=2, type=int, default=list(maps.DEFAULT_YEAR_RANGE),
+                        metavar=("START", "END"))
+    parser.add_argument("--format", default="csv", choices=OUTPUT_FORMATS)
+    parser.add_argument("--out", help="output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    metrics = QUERIES[args.query][1]
+    if metrics is not None and args.metric not in metrics:
+        parser.error(f"--metric for {args.query} must be one of: {', '.join(metrics)}")
+    if args.format not in exports.available_formats() + ["json"]:
+        parser.error(f"{args.format} output needs {exports.FORMATS[args.format][3]} installed")
+
+    payload = serialize(run_query(args.query, args.year_range, args.metric, args.region_type), args.format)
+    if args.out:
+        with open(args.out, "wb") as f:
+            f.write(payload)
+    else:
+        sys.stdout.buffer.write(payload)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Country rankings for the map indices.
+
+All four indices are ranked in one vectorized pass per year range and the
+result is cached, so the map tooltips, Quick Insights, the ranking table and
+the rankings export share one set of sorts instead of each re-sorting.
+
+Each ranking carries three rank flavours:
+
+- ``rank``: position in the sorted list (1, 2, 3, 4), ties broken by country
+  name; this is what the dashboard displays
+- ``dense_rank``: ties share a rank, no gaps (1, 2, 2, 3)
+- ``min_rank``: standard competition ranking (1, 2, 2, 4)
+"""
+
+import functools
+
+import numpy as np
+import pandas as pd
+
+from dashboard import cube, data
+
+
+def rank_frame(df, index_columns, ascending=False):
+    """Rank every column of ``index_columns`` in ``df`` (one row per country).
+
+    Returns {column: DataFrame[country, column, rank, dense_rank, min_rank]}
+    sorted by rank, with countries lacking a value left out.
+    """
+    countries = df["country"].to_numpy()
+    values = df[index_columns].to_numpy(dtype=np.float64)
+    # Sort keys: NaN last, then by value, then by country name for ties
+    keys = values if ascending else -values
+    keys = np.where(np.isnan(keys), np.inf, keys)
+    by_name = np.argsort(countries, kind="stable")
+
+    rankings = {}
+    for i, column in enumerate(index_columns):
+        order = by_name[np.argsort(keys[by_name, i], kind="stable")]
+        order = order[~np.isnan(values[order, i])]
+        sorted_values = values[order, i]
+
+        new_value = np.empty(len(order), dtype=bool)
+        new_value[:1] = True
+        new_value[1:] = sorted_values[1:] != sorted_values[:-1]
+        position = np.arange(1, len(order) + 1)
+
+        rankings[column] = pd.DataFrame({
+            "country": countries[order],
+            column: sorted_values,
+            "rank": position,
+            "dense_rank": np.cumsum(new_value),
+            "min_rank": np.maximum.accumulate(np.where(new_value, position, 0)),
+        })
+    return rankings
+
+
+def get_rankings(year_range):
+    """Cached rankings of every map index for ``year_range`` (read-only frames)."""
+    year_range = tuple(year_range)
+    return _rankings(data.range_version(year_range), year_range)
+
+
+@functools.lru_cache(maxsize=128)
+def _rankings(range_version, year_range):
+    # ``range_version`` only keys the cache: a refresh that didn't change
+    # these years keeps the entry
+    df = cube.index_frame(year_range)
+    return rank_frame(df, list(cube.INDEX_COLUMNS))
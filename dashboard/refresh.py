@@ -0,0 +1,83 @@
+"""Pick up a new education_data.csv without restarting the process.
+
+``DATASET_REFRESHER`` polls the column store every ``POLL_SECONDS`` on a
+background thread.  When the CSV changes it:
+
+1. loads the new store version next to the one being served,
+2. finds the (country, year) keys whose rows were added, edited or removed,
+3. rebuilds the index cube rows of just those countries and the region
+   frame for the new version, before anyone can see it,
+4. swaps the new ``data.DatasetState`` in with a single assignment.
+
+Rankings, regional averages, trend fits, figures and exports are cached
+under the dataset's ``range_version`` of their year range.  After a refresh,
+only year ranges that contain a changed year miss the cache and recompute
+on demand.  Everything else keeps serving its cached result.  Sessions stay
+connected throughout, and no cache is cleared all at once.
+"""
+
+import os
+import threading
+import time
+
+from dashboard import cube, data, metrics, regional, store
+
+POLL_SECONDS = 30.0
+
+
+class DatasetRefresher:
+    """Background thread that keeps ``data.current_state()`` up to date."""
+
+    def __init__(self, poll_seconds=POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self.last_error = None
+        self.last_refresh = None  # {"version", "changed_rows", "changed_years", "seconds"}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        """Start the polling thread (idempotent)."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="dataset-refresh", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.poll_seconds)
+            try:
+                self.refresh()
+                self.last_error = None
+            except Exception as e:
+                # Keep serving the current version; retry on the next poll
+                self.last_error = e
+
+    def refresh(self):
+        """Swap in the latest column store version if it changed; return whether it did."""
+        current = data.current_state()
+        version_dir = store.ensure_store()
+        version = os.path.basename(version_dir)
+        if version == current.version:
+            return False
+
+        start = time.perf_counter()
+        with metrics.timed("dataset_refresh"):
+            state = data.next_state(current, version, data.read_dataset(version_dir))
+            # Warm what every page reads first, so no request pays for it
+            cube.get_cube(state)
+            regional.regional_frame(state)
+            data.swap_state(state)
+            # The old version is no longer needed for incremental builds
+            state.previous = None
+
+        changed = state.changed
+        self.last_refresh = {
+            "version": version,
+            "changed_rows": None if changed is None else len(changed),
+            "changed_years": None if changed is None else sorted(int(y) for y in changed["year"].unique()),
+            "seconds": time.perf_counter() - start,
+        }
+        return True
+
+
+DATASET_REFRESHER = DatasetRefresher()
@@ -0,0 +1,97 @@
+"""Regional aggregates for the Regional Comparison page.
+
+``regional_averages`` is a pure function of (region column, metric, year
+range).  It reads the shared, already-normalized dataset through a year mask
+and grouped ``bincount`` sums, never writes to its input, and makes no
+filtered copy of the frame.  Results are cached and shared between sessions,
+so treat them as read-only.
+"""
+
+import functools
+
+import numpy as np
+import pandas as pd
+
+from dashboard import data
+
+# Sub-metrics averaged for each metric on the Regional Comparison page
+METRIC_OPTIONS = {
+    "Completion Index": ["comp_prim_v2_m", "comp_lowsec_v2_m", "comp_upsec_v2_m"],
+    "Attainment Index": ["edu2_2024_m", "edu4_2024_m"],
+    "Higher Education Index": ["comp_higher_2yrs_2529_m", "comp_higher_4yrs_2529_m"],
+    "Dropout Index": ["eduout_prim_m", "eduout_lowsec_m", "eduout_upsec_m"]
+}
+
+# Region type labels on the Regional Comparison page -> region column
+REGION_TYPES = {
+    "Geographic Regions": "geographic_region",
+    "Economic Regions": "economic_region",
+}
+
+
+def average_column(metric):
+    """Name of the per-region average column, e.g. "completion_index_average"."""
+    return f"{metric.lower().replace(' ', '_')}_average"
+
+
+def regional_frame(state=None):
+    """Normalized dataset plus categorical region columns, shared and read-only."""
+    def build(state):
+        columns = ["country", "year"] + sorted({c for cols in METRIC_OPTIONS.values() for c in cols})
+        df = data.get_columns(columns, normalized=True, state=state)
+        for region_col in data.REGION_GROUPINGS:
+            df[region_col] = data.assign_regions(df["country"], region_col)
+        return df
+
+    return (state or data.current_state()).derived("regional_frame", build)
+
+
+def calculate_regional_averages(df, region_col, metric_cols, average_col, year_range=None):
+    """Mean of each metric column per region, plus their mean as ``average_col``.
+
+    Equivalent to ``df.groupby(region_col, observed=True)[metric_cols].mean()``
+    over the rows within ``year_range``, without modifying or copying ``df``.
+    """
+    regions = df[region_col].astype("category")
+    codes = regions.cat.codes.to_numpy()
+    rows = codes >= 0
+    if year_range is not None:
+        years = df["year"].to_numpy()
+        rows &= (years >= year_range[0]) & (years <= year_range[1])
+
+    n_regions = len(regions.cat.categories)
+    present = np.bincount(codes[rows], minlength=n_regions) > 0
+    means = {}
+    for column in metric_cols:
+        values = df[column].to_numpy(dtype=np.float64)
+        valid = rows & ~np.isnan(values)
+        sums = np.bincount(codes[valid], weights=values[valid], minlength=n_regions)
+        counts = np.bincount(codes[valid], minlength=n_regions)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means[column] = (sums / counts)[present]
+
+    regional_data = pd.DataFrame({region_col: regions.cat.categories[present], **means})
+    regional_data[average_col] = regional_data[metric_cols].mean(axis=1)
+    return regional_data
+
+
+def regional_averages(region_col, metric, year_range):
+    """Cached regional averages of ``metric`` for ``year_range`` (read-only).
+
+    Read from the precomputed tables when they are current.
+    """
+    year_range = tuple(year_range)
+    return _regional_averages(data.range_version(year_range), region_col, metric, year_range)
+
+
+@functools.lru_cache(maxsize=256)
+def _regional_averages(range_version, region_col, metric, year_range):
+    # Imported here: the precompute build imports this module
+    from dashboard import precompute
+
+    precomputed = precompute.regional_averages(region_col, metric, tuple(year_range))
+    if precomputed is not None:
+        return precomputed
+    return calculate_regional_averages(
+        regional_frame(), region_col, METRIC_OPTIONS[metric], average_column(metric), tuple(year_range)
+    )
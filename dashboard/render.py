@@ -0,0 +1,63 @@
+"""Process-wide cache of built chart and map inputs.
+
+Streamlit reruns a page top to bottom on every interaction, so identical
+views used to rebuild the same Plotly figures and map layers over and over.
+Pages now build them through ``RENDER_CACHE`` keyed by the effective inputs
+(metric, map type, year range, selected countries, display options).  A
+repeated view then gets the already-built object back.
+
+Cached objects are shared between sessions and must not be modified.
+``st.plotly_chart`` only reads the figure it is given.  Folium maps themselves
+are not cached: ``st_folium`` appends scripts to a map each time it renders
+one, so the map page caches the annotated GeoJSON and marker data instead.
+"""
+
+import collections
+import threading
+
+MAX_ENTRIES = 256
+
+
+class RenderCache:
+    """Thread-safe LRU of built render objects, bounded by entry count."""
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, build):
+        """Return the cached object for ``key``, calling ``build()`` on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        # Build outside the lock; a concurrent miss on the same key just builds twice
+        value = build()
+        with self._lock:
+            self._entries.setdefault(key, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+RENDER_CACHE = RenderCache()
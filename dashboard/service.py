@@ -0,0 +1,289 @@
+"""Read-only JSON HTTP service over the dashboard data.
+
+    python -m dashboard.service --port 8600 --ttl 60
+
+Serves the data behind the three pages without a Streamlit session:
+
+- ``GET /api/value_dict?metric=Completion Index&start=2015&end=2024``:
+  per-country map values and the colour scale bounds
+- ``GET /api/ranking?metric=...&start=...&end=...``: the map ranking
+- ``GET /api/trend?column=comp_prim_v2_m&countries=Peru,Chile&start=...``:
+  Trendline series plus each country's fitted trend
+- ``GET /api/regional?metric=...&region_type=Economic Regions&start=...``:
+  Regional Comparison averages
+- ``GET /api/version`` and ``GET /metrics`` (Prometheus text)
+
+Trend metrics need the background slope table; until its first build is
+done they are answered with 503 and a ``Retry-After`` header.
+
+The server is a small asyncio HTTP/1.1 loop (one request per connection);
+computations run in worker threads through the same cached functions as the
+pages.  Responses carry an ETag made of the column store version and a hash
+of the body, so pollers sending ``If-None-Match`` get an empty 304 until the
+data changes.  Bodies are kept in an in-process TTL cache keyed by endpoint,
+parameters and data version, and concurrent requests for the same uncached
+response share a single computation.
+"""
+
+import argparse
+import asyncio
+import collections
+import hashlib
+import json
+import threading
+import time
+from http import HTTPStatus
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+
+from dashboard import data, maps, metrics, query, refresh, regional, store, trends
+
+DEFAULT_TTL = 60.0
+READ_TIMEOUT = 10.0
+RETRY_AFTER = 5  # seconds, while the trend slope table is still being built
+
+
+class TTLCache:
+    """Thread-safe LRU whose entries expire ``ttl`` seconds after being stored."""
+
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Cached value for ``key``, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class BadRequest(ValueError):
+    """Invalid query parameters (answered with 400)."""
+
+
+def _year_range(params):
+    try:
+        return (int(params.get("start", maps.DEFAULT_YEAR_RANGE[0])), int(params.get("end", maps.DEFAULT_YEAR_RANGE[1])))
+    except ValueError:
+        raise BadRequest("start and end must be integers") from None
+
+
+def _choice(params, name, choices, default=None):
+    value = params.get(name, default)
+    if value not in choices:
+        raise BadRequest(f"{name} must be one of: {', '.join(choices)}")
+    return value
+
+
+def _records(df):
+    """JSON-ready list of row dicts (NaN becomes null)."""
+    return json.loads(store.widen_floats(df).to_json(orient="records", force_ascii=False))
+
+
+def value_dict_payload(params):
+    metric = _choice(params, "metric", maps.METRIC_COLUMNS, "Completion Index")
+    year_range = _year_range(params)
+    df_merged, _, _ = maps.metric_data(maps.METRIC_COLUMNS[metric], year_range)
+    scale = maps.value_scale(df_merged, maps.METRIC_COLUMNS[metric])
+    values, min_val, max_val = scale if scale is not None else ({}, None, None)
+    return {"metric": metric, "year_range": year_range, "min": min_val, "max": max_val, "values": values}
+
+
+def ranking_payload(params):
+    metric = _choice(params, "metric", maps.METRIC_COLUMNS, "Completion Index")
+    year_range = _year_range(params)
+    _, country_ranking, _ = maps.metric_data(maps.METRIC_COLUMNS[metric], year_range)
+    return {"metric": metric, "year_range": year_range, "ranking": _records(country_ranking)}
+
+
+def trend_payload(params):
+    column = _choice(params, "column", trends.TREND_COLUMNS)
+    year_range = _year_range(params)
+    countries = sorted(filter(None, params.get("countries", "").split(",")))
+    try:
+        series = query.trend_series(column, year_range, countries)
+    except KeyError:
+        raise BadRequest(f"{column} is not in the dataset") from None
+
+    fits = trends.country_trends(column, year_range)
+    if countries:
+        fits = fits[fits.index.isin(countries)]
+    fits = fits[["n", "slope", "intercept", "r2"]].rename_axis("country").reset_index()
+    return {"column": column, "year_range": year_range, "series": _records(series), "trends": _records(fits)}
+
+
+def regional_payload(params):
+    metric = _choice(params, "metric", regional.METRIC_OPTIONS, "Completion Index")
+    region_type = _choice(params, "region_type", regional.REGION_TYPES, "Geographic Regions")
+    year_range = _year_range(params)
+    averages = regional.regional_averages(regional.REGION_TYPES[region_type], metric, year_range)
+    return {"metric": metric, "region_type": region_type, "year_range": year_range, "regions": _records(averages)}
+
+
+ENDPOINTS = {
+    "/api/value_dict": value_dict_payload,
+    "/api/ranking": ranking_payload,
+    "/api/trend": trend_payload,
+    "/api/regional": regional_payload,
+    "/api/version": lambda params: {"version": data.active_version()},
+}
+
+
+def _json_default(value):
+    # numpy scalars that slipped through dict payloads
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class DashboardService:
+    """Routes requests to ``ENDPOINTS`` with ETags, a TTL cache and coalescing."""
+
+    def __init__(self, ttl=DEFAULT_TTL):
+        self.cache = TTLCache(ttl)
+        self._pending = {}  # cache key -> Future of a computation in progress
+
+    def _build(self, path, params):
+        """JSON body of one endpoint call; runs in a worker thread."""
+        with metrics.timed(f"api{path[len('/api'):].replace('/', '_')}"):
+            payload = ENDPOINTS[path](params)
+            body = json.dumps(payload, allow_nan=False, default=_json_default).encode("utf-8")
+        return body
+
+    async def response(self, path, params):
+        """(etag, body) for ``path``, cached per data version."""
+        version = await asyncio.to_thread(data.active_version)
+        key = (path, tuple(sorted(params.items())), version)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        if key not in self._pending:
+            async def compute():
+                try:
+                    body = await asyncio.to_thread(self._build, path, params)
+                    entry = (f'"{version}-{hashlib.blake2b(body, digest_size=8).hexdigest()}"', body)
+                    self.cache.put(key, entry)
+                    return entry
+                finally:
+                    del self._pending[key]
+            self._pending[key] = asyncio.ensure_future(compute())
+        return await asyncio.shield(self._pending[key])
+
+    async def handle(self, method, target, headers):
+        """(status, extra headers, body) for one request."""
+        if method not in ("GET", "HEAD"):
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"Allow": "GET, HEAD"}, _error("Only GET and HEAD are supported")
+        url = urlsplit(target)
+        if url.path == "/metrics":
+            return HTTPStatus.OK, {"Content-Type": "text/plain; version=0.0.4"}, metrics.to_prometheus().encode("utf-8")
+        if url.path not in ENDPOINTS:
+            return HTTPStatus.NOT_FOUND, {}, _error(f"Unknown endpoint {url.path}")
+
+        try:
+            etag, body = await self.response(url.path, dict(parse_qsl(url.query)))
+        except BadRequest as e:
+            return HTTPStatus.BAD_REQUEST, {}, _error(str(e))
+        except trends.SlopeTablePending as e:
+            # Trend metrics are served once the background slope table is built
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"Retry-After": str(RETRY_AFTER)}, _error(str(e))
+
+        cache_headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag in (tag.strip() for tag in headers.get("if-none-match", "").split(",")):
+            return HTTPStatus.NOT_MODIFIED, cache_headers, b""
+        return HTTPStatus.OK, cache_headers, body
+
+    async def serve_connection(self, reader, writer):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), READ_TIMEOUT)
+            if not request_line:
+                return
+            headers = {}
+            while True:
+                line = await asyncio.wait_for(reader.readline(), READ_TIMEOUT)
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            parts = request_line.decode("latin-1").split()
+            method = parts[0] if parts else ""
+            if len(parts) != 3:
+                status, extra_headers, body = HTTPStatus.BAD_REQUEST, {}, _error("Malformed request")
+            else:
+                try:
+                    status, extra_headers, body = await self.handle(method, parts[1], headers)
+                except Exception as e:
+                    status, extra_headers, body = HTTPStatus.INTERNAL_SERVER_ERROR, {}, _error(f"{type(e).__name__}: {e}")
+
+            response_headers = {
+                "Content-Type": "application/json",
+                "Content-Length": str(len(body)),
+                "Access-Control-Allow-Origin": "*",
+                "Connection": "close",
+                **extra_headers,
+            }
+            head = f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            head += "".join(f"{name}: {value}\r\n" for name, value in response_headers.items()) + "\r\n"
+            writer.write(head.encode("latin-1") + (body if method != "HEAD" else b""))
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+def _error(message):
+    return json.dumps({"error": message}).encode("utf-8")
+
+
+async def serve(host="127.0.0.1", port=8600, ttl=DEFAULT_TTL):
+    refresh.DATASET_REFRESHER.start()
+    service = DashboardService(ttl)
+    server = await asyncio.start_server(service.serve_connection, host, port)
+    print(f"Serving dashboard data on http://{host}:{port}/api/")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the dashboard data as JSON over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--ttl", type=float, default=DEFAULT_TTL, help="seconds a response stays cached")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.ttl))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Pre-rendered map HTML for the landing view of the map page.
+
+Run offline (e.g. after deploying a new education_data.csv)::
+
+    python -m dashboard.snapshots                 # default year range only
+    python -m dashboard.snapshots --common        # plus COMMON_YEAR_RANGES
+    python -m dashboard.snapshots --year-range 2005 2015
+
+Every metric × map type is rendered to a standalone folium HTML page under
+``SNAPSHOT_DIR``, next to a ``manifest.json`` recording the data and geometry
+they were built from.  The map page serves a snapshot for the first paint of
+a session, so landing visitors don't wait for the map to be built.  Stale
+snapshots (different data or GeoJSON) are ignored rather than served.
+"""
+
+import argparse
+import functools
+import json
+import os
+import tempfile
+
+from dashboard import cube, data, geometry, maps
+
+SNAPSHOT_DIR = ".cache/map_snapshots"
+COMMON_YEAR_RANGES = [(2000, 2024), (2010, 2024), (2020, 2024)]
+
+
+def source_version(geojson_path=geometry.GEOJSON_PATH):
+    """Identity of the inputs a snapshot depends on: column store + GeoJSON file."""
+    stat = os.stat(geojson_path)
+    return {
+        "data": data.active_version(),
+        "geojson": {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns},
+    }
+
+
+def snapshot_name(metric, map_type, year_range):
+    slug = f"{maps.METRIC_COLUMNS[metric]}_{map_type.replace(' ', '_').lower()}"
+    return f"{slug}_{year_range[0]}_{year_range[1]}.html"
+
+
+def build_snapshots(year_ranges=(maps.DEFAULT_YEAR_RANGE,), snapshot_dir=SNAPSHOT_DIR):
+    """Render every metric × map type for ``year_ranges``; return the file names."""
+    os.makedirs(snapshot_dir, exist_ok=True)
+    index_cube = cube.get_cube()
+    written = []
+    for year_range in year_ranges:
+        # Clamp to the data so the key matches what the page's slider can produce
+        year_range = (max(year_range[0], index_cube.first_year), min(year_range[1], index_cube.last_year))
+        for metric in maps.METRIC_COLUMNS:
+            for map_type in maps.MAP_TYPES:
+                # Offline, so wait for the trend slope table
+                m = maps.build_map(metric, map_type, year_range, timeout=None)
+                if m is None:
+                    continue
+                name = snapshot_name(metric, map_type, year_range)
+                _write_atomic(os.path.join(snapshot_dir, name), m.get_root().render())
+                written.append(name)
+
+    _write_atomic(os.path.join(snapshot_dir, "manifest.json"), json.dumps({
+        "source": source_version(),
+        "snapshots": sorted(written),
+    }))
+    return written
+
+
+def _write_atomic(path, text):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+@functools.lru_cache(maxsize=4)
+def _manifest(path, mtime_ns):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@functools.lru_cache(maxsize=64)
+def _snapshot_html(path, mtime_ns):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def load_snapshot(metric, map_type, year_range, snapshot_dir=SNAPSHOT_DIR):
+    """Pre-rendered HTML for this view, or None if there is no current snapshot.
+
+    Files are read once and then served from memory until they change.
+    """
+    manifest_path = os.path.join(snapshot_dir, "manifest.json")
+    try:
+        manifest = _manifest(manifest_path, os.stat(manifest_path).st_mtime_ns)
+        name = snapshot_name(metric, map_type, year_range)
+        if name not in manifest["snapshots"] or manifest["source"] != source_version():
+            return None
+        path = os.path.join(snapshot_dir, name)
+        return _snapshot_html(path, os.stat(path).st_mtime_ns)
+    except (FileNotFoundError, ValueError, KeyError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-render the map page's folium maps.")
+    parser.add_argument("--common", action="store_true", help="also render COMMON_YEAR_RANGES")
+    parser.add_argument(
+        "--year-range", nargs=2, type=int, action="append", default=[], metavar=("START", "END"),
+        help="extra year range to render (repeatable)"
+    )
+    parser.add_argument("--out", default=SNAPSHOT_DIR, help=f"output directory (default {SNAPSHOT_DIR})")
+    args = parser.parse_args(argv)
+
+    year_ranges = [maps.DEFAULT_YEAR_RANGE]
+    if args.common:
+        year_ranges += COMMON_YEAR_RANGES
+    year_ranges += [tuple(r) for r in args.year_range]
+
+    written = build_snapshots(year_ranges, args.out)
+    print(f"Wrote {len(written)} map snapshots to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Measure the cold-start import cost of each dashboard page.
+
+    python -m dashboard.startup              # from the repository root
+    python -m dashboard.startup --runs 5 --top 8
+
+For every page the top-level import statements are read from the script
+(without running it) and executed in a fresh interpreter.  The harness
+reports the median wall time over ``--runs`` and the slowest top-level
+modules according to ``python -X importtime``.  This is what a freshly
+spawned worker pays before the first page can render.
+"""
+
+import argparse
+import ast
+import statistics
+import subprocess
+import sys
+
+PAGES = ["map.py", "pages/Trendline.py", "pages/Regional_Comparison.py"]
+
+_TIMER = "import time as _t; _start = _t.perf_counter()\n{imports}\nprint(_t.perf_counter() - _start)\n"
+
+
+def page_imports(path):
+    """Source of the top-level import statements of the script at ``path``."""
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def _parse_importtime(stderr):
+    """{top-level module: cumulative seconds} from ``-X importtime`` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented below their parent; keep the outermost only
+        if cumulative.strip().isdigit() and len(name) - len(name.lstrip()) == 1:
+            modules[name.strip()] = int(cumulative) / 1e6
+    return modules
+
+
+def measure(imports, runs=3):
+    """(median seconds, {module: cumulative seconds} of the last run)."""
+    timings = []
+    modules = {}
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", _TIMER.format(imports=imports)],
+            capture_output=True, text=True, check=True
+        )
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+        modules = _parse_importtime(result.stderr)
+    return statistics.median(timings), modules
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold-start import time of the dashboard pages.")
+    parser.add_argument("pages", nargs="*", default=PAGES, help="page scripts (default: all pages)")
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters per page (median is reported)")
+    parser.add_argument("--top", type=int, default=5, help="slowest top-level modules to list")
+    args = parser.parse_args(argv)
+
+    for page in args.pages:
+        seconds, modules = measure(page_imports(page), args.runs)
+        print(f"{page}: {seconds * 1000:.0f} ms")
+        for name, cumulative in sorted(modules.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"    {cumulative * 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
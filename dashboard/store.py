@@ -0,0 +1,193 @@
+"""Columnar on-disk cache of education_data.csv.
+
+The CSV is parsed once and written as one ``.npy`` file per column under
+``CACHE_DIR``: metric columns as float32, ``year`` as int16 and text columns
+(``country`` included) as categorical codes plus a category list.  Readers
+memory-map only the columns they ask for, so every worker process after the
+first skips CSV parsing entirely.
+
+The cache is rebuilt only when the CSV changes.  A changed size or mtime
+triggers a content hash; if the hash still matches, only the recorded mtime
+is refreshed.  A rebuild keeps the previous version on disk, since another
+process may have just read the old pointer and not loaded its files yet.
+Versions older than that are removed.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+CSV_PATH = "education_data.csv"
+CACHE_DIR = ".cache/education_data"
+SCHEMA_VERSION = 1
+
+# Rows without these can't be placed on a map or a timeline
+KEY_COLUMNS = ["country", "year"]
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_json_atomic(path, payload):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _encode_column(series):
+    """Return (kind, values, categories) for one CSV column."""
+    if series.name == "year":
+        return "int16", series.to_numpy(dtype=np.int16), None
+    if pd.api.types.is_numeric_dtype(series):
+        return "float32", series.to_numpy(dtype=np.float32), None
+    categorical = series.astype("category")
+    categories = [str(c) for c in categorical.cat.categories]
+    code_dtype = np.int16 if len(categories) < np.iinfo(np.int16).max else np.int32
+    return "category", categorical.cat.codes.to_numpy(dtype=code_dtype), categories
+
+
+def build_store(csv_path=CSV_PATH, cache_dir=CACHE_DIR, sha256=None):
+    """Parse ``csv_path`` and write a new column store version; return its directory."""
+    sha256 = sha256 or _file_sha256(csv_path)
+    version = sha256[:16]
+    os.makedirs(cache_dir, exist_ok=True)
+    version_dir = os.path.join(cache_dir, version)
+
+    if not os.path.exists(os.path.join(version_dir, "schema.json")):
+        df = pd.read_csv(csv_path, low_memory=False)
+        df["year"] = pd.to_numeric(df["year"], errors="coerce")
+        df = df.dropna(subset=KEY_COLUMNS).reset_index(drop=True)
+
+        # Build next to the final location so the rename below is atomic
+        tmp_dir = tempfile.mkdtemp(dir=cache_dir, prefix=".build-")
+        columns = {}
+        for i, name in enumerate(df.columns):
+            kind, values, categories = _encode_column(df[name])
+            file_name = f"c{i:04d}.npy"
+            np.save(os.path.join(tmp_dir, file_name), values)
+            columns[name] = {"kind": kind, "file": file_name}
+            if categories is not None:
+                columns[name]["categories"] = categories
+        _write_json_atomic(os.path.join(tmp_dir, "schema.json"), {
+            "schema_version": SCHEMA_VERSION,
+            "rows": len(df),
+            "order": list(df.columns),
+            "columns": columns,
+        })
+        try:
+            os.rename(tmp_dir, version_dir)
+        except OSError:
+            # Another worker finished the same version first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    stat = os.stat(csv_path)
+    current = _read_json(os.path.join(cache_dir, "current.json")) or {}
+    previous = current.get("version") if current.get("version") != version else current.get("previous")
+    _write_json_atomic(os.path.join(cache_dir, "current.json"), {
+        "schema_version": SCHEMA_VERSION,
+        "version": version,
+        "previous": previous,
+        "sha256": sha256,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    })
+    _remove_stale_versions(cache_dir, keep={version, previous})
+    return version_dir
+
+
+def _remove_stale_versions(cache_dir, keep):
+    for entry in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, entry)
+        if entry not in keep and os.path.isdir(path) and not entry.startswith(".build-"):
+            # Safe on POSIX even while another process still has files mapped
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def widen_floats(df):
+    """``df`` with float32 columns as float64 at their shortest decimal value.
+
+    For JSON, CSV and other output.  A plain cast would write the float32
+    rounding error (23.97 becomes 23.969999313354492).  Going through the
+    float32 repr gives back the number that was in the CSV.
+    """
+    float32_columns = [c for c in df.columns if df[c].dtype == np.float32]
+    if not float32_columns:
+        return df
+    df = df.copy(deep=False)
+    for column in float32_columns:
+        df[column] = df[column].astype(str).astype(np.float64)
+    return df
+
+
+def ensure_store(csv_path=CSV_PATH, cache_dir=CACHE_DIR):
+    """Return the directory of an up-to-date column store, building it if needed."""
+    current = _read_json(os.path.join(cache_dir, "current.json"))
+    stat = os.stat(csv_path)
+
+    if current and current.get("schema_version") == SCHEMA_VERSION:
+        version_dir = os.path.join(cache_dir, current["version"])
+        if os.path.exists(os.path.join(version_dir, "schema.json")):
+            if current["size"] == stat.st_size and current["mtime_ns"] == stat.st_mtime_ns:
+                return version_dir
+            sha256 = _file_sha256(csv_path)
+            if sha256 == current["sha256"]:
+                # Touched but unchanged: remember the new mtime, keep the data
+                current.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+                _write_json_atomic(os.path.join(cache_dir, "current.json"), current)
+                return version_dir
+            return build_store(csv_path, cache_dir, sha256=sha256)
+
+    return build_store(csv_path, cache_dir)
+
+
+def store_columns(csv_path=CSV_PATH, cache_dir=CACHE_DIR, version_dir=None):
+    """List the columns available in the store, in CSV order."""
+    version_dir = version_dir or ensure_store(csv_path, cache_dir)
+    schema = _read_json(os.path.join(version_dir, "schema.json"))
+    return list(schema["order"])
+
+
+def read_columns(columns=None, csv_path=CSV_PATH, cache_dir=CACHE_DIR, version_dir=None):
+    """Load ``columns`` (all when None) from the store as a typed DataFrame.
+
+    Reads the up-to-date version unless ``version_dir`` pins one.  Numeric
+    columns are memory-mapped read-only; unknown column names raise
+    ``KeyError`` like ``pd.read_csv(usecols=...)`` does with a ValueError.
+    """
+    version_dir = version_dir or ensure_store(csv_path, cache_dir)
+    schema = _read_json(os.path.join(version_dir, "schema.json"))
+    if columns is None:
+        columns = schema["order"]
+
+    missing = [c for c in columns if c not in schema["columns"]]
+    if missing:
+        raise KeyError(f"Columns not in {csv_path}: {missing}")
+
+    data = {}
+    for name in columns:
+        meta = schema["columns"][name]
+        values = np.load(os.path.join(version_dir, meta["file"]), mmap_mode="r")
+        if meta["kind"] == "category":
+            data[name] = pd.Categorical.from_codes(np.asarray(values), categories=meta["categories"])
+        else:
+            data[name] = values
+    return pd.DataFrame(data, columns=list(columns), copy=False)
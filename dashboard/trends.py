@@ -0,0 +1,379 @@
+"""Batched linear trend fitting for the Trendline page.
+
+Rather than calling ``np.polyfit`` once per country, every country is fitted
+in one pass: the grouped sums of x, y, xy, x² and y² are accumulated with
+``np.bincount`` and the ordinary least-squares slope, intercept, R² and
+standard errors follow in closed form.  Fitting all ~200 countries costs
+about the same as fitting four, which makes trend lines for large selections
+and the "fastest improvers" leaderboard cheap.
+
+Years are shifted by the first year before summing so the x² sums stay well
+conditioned; slopes are in units per year and intercepts are at year 0, i.e.
+``value = intercept + slope * year`` as with ``np.polyfit(years, values, 1)``.
+
+``SLOPE_TABLE`` keeps the long-run (all years) slope of every Trendline
+metric for every country.  It is computed on a background thread and
+re-checked every ``POLL_SECONDS``.  When the served dataset changes, only
+the columns whose contents changed are refitted, and readers never wait on a
+refresh.
+Pages wait at most ``SLOPE_WAIT_SECONDS`` for the first build and show a
+placeholder until it is ready.
+"""
+
+import functools
+import hashlib
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from dashboard import data, ranking
+
+# Metric categories and sub-metric columns shown on the Trendline page
+TREND_METRICS = {
+    "Dropout Index": {
+        "Primary Dropout Rate": "eduout_prim_m",
+        "Lower Secondary Dropout Rate": "eduout_lowsec_m",
+        "Upper Secondary Dropout Rate": "eduout_upsec_m",
+    },
+    "Completion Index": {
+        "Primary Completion Rate": "comp_prim_v2_m",
+        "Lower Secondary Completion Rate": "comp_lowsec_v2_m",
+        "Upper Secondary Completion Rate": "comp_upsec_v2_m",
+    },
+    "Attainment Index": {
+        "Primary Attainment Rate": "attain_prim_m",
+        "Lower Secondary Attainment Rate": "attain_lowsec_m",
+        "Upper Secondary Attainment Rate": "attain_upsec_m",
+    },
+    "Higher Ed Completion Index": {
+        "Higher Ed Completion Rate": "higher_ed_comp_v2_m"
+    }
+}
+TREND_COLUMNS = [column for submetrics in TREND_METRICS.values() for column in submetrics.values()]
+
+# Map metrics derived from the slope table: mean slope of their sub-metrics
+INDEX_TRENDS = {
+    "completion_trend": list(TREND_METRICS["Completion Index"].values()),
+}
+
+POLL_SECONDS = 30.0
+# How long a page waits for the first slope table before showing a placeholder
+SLOPE_WAIT_SECONDS = 0.5
+
+# Two-sided 95% Student t critical values for 1..30 degrees of freedom; the
+# normal value is close enough beyond that
+_T95 = np.array([
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+])
+_Z95 = 1.960
+
+# Fewer points than this and a country gets no trend (two points always fit
+# perfectly and leave no residual to estimate a band from)
+MIN_POINTS = 3
+
+
+def t_critical(dof):
+    """95% two-sided t critical value for each entry of ``dof``."""
+    dof = np.asarray(dof)
+    table = np.take(_T95, np.clip(dof, 1, len(_T95)) - 1)
+    return np.where(dof > len(_T95), _Z95, np.where(dof >= 1, table, np.nan))
+
+
+def fit_trends(groups, years, values, min_points=MIN_POINTS):
+    """Least-squares line of ``values`` on ``years`` for every group at once.
+
+    ``groups`` is a categorical (or anything ``astype("category")`` accepts);
+    rows with a missing group, year or value are ignored.  Returns a DataFrame
+    indexed by group with n, first_year, last_year, slope, intercept, r2,
+    slope_se, residual_std, year_mean and year_ss.  Groups with fewer than
+    ``min_points`` points are left out.
+    """
+    groups = pd.Series(groups).astype("category")
+    codes = groups.cat.codes.to_numpy()
+    x = np.asarray(years, dtype=np.float64)
+    y = np.asarray(values, dtype=np.float64)
+    valid = (codes >= 0) & ~np.isnan(x) & ~np.isnan(y)
+    codes, x, y = codes[valid], x[valid], y[valid]
+
+    n_groups = len(groups.cat.categories)
+    offset = x.min() if len(x) else 0.0
+    x = x - offset
+
+    def grouped_sum(weights=None):
+        return np.bincount(codes, weights=weights, minlength=n_groups)
+
+    n = grouped_sum()
+    keep = n >= min_points
+    n = n[keep]
+    sx, sy = grouped_sum(x)[keep], grouped_sum(y)[keep]
+    sxx, sxy, syy = grouped_sum(x * x)[keep], grouped_sum(x * y)[keep], grouped_sum(y * y)[keep]
+    first = np.full(n_groups, np.inf)
+    last = np.full(n_groups, -np.inf)
+    np.minimum.at(first, codes, x)
+    np.maximum.at(last, codes, x)
+
+    # Centered sums of squares and cross-products
+    x_mean = sx / n
+    x_ss = sxx - sx * x_mean
+    xy_ss = sxy - sx * sy / n
+    y_ss = np.maximum(syy - sy * sy / n, 0.0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope = xy_ss / x_ss
+        intercept = sy / n - slope * x_mean
+        residual_ss = np.maximum(y_ss - slope * xy_ss, 0.0)
+        r2 = np.where(y_ss > 0, 1.0 - residual_ss / y_ss, np.nan)
+        residual_std = np.sqrt(residual_ss / (n - 2))
+        slope_se = residual_std / np.sqrt(x_ss)
+
+    return pd.DataFrame({
+        "n": n.astype(np.int64),
+        "first_year": (first[keep] + offset).astype(np.int64),
+        "last_year": (last[keep] + offset).astype(np.int64),
+        "slope": slope,
+        "intercept": intercept - slope * offset,
+        "r2": r2,
+        "slope_se": slope_se,
+        "residual_std": residual_std,
+        "year_mean": x_mean + offset,
+        "year_ss": x_ss,
+    }, index=pd.Index(groups.cat.categories[keep], name=groups.name))
+
+
+def trend_band(fit, years):
+    """(fitted, lower, upper) arrays of shape (len(fit), len(years)).
+
+    ``lower``/``upper`` is the 95% confidence band of the fitted line (the
+    mean response), not a prediction interval for single observations.
+    """
+    years = np.asarray(years, dtype=np.float64)[None, :]
+    slope = fit["slope"].to_numpy()[:, None]
+    fitted = fit["intercept"].to_numpy()[:, None] + slope * years
+    with np.errstate(invalid="ignore", divide="ignore"):
+        spread = np.sqrt(
+            1.0 / fit["n"].to_numpy()[:, None]
+            + (years - fit["year_mean"].to_numpy()[:, None]) ** 2 / fit["year_ss"].to_numpy()[:, None]
+        )
+    margin = (t_critical(fit["n"].to_numpy() - 2) * fit["residual_std"].to_numpy())[:, None] * spread
+    return fitted, fitted - margin, fitted + margin
+
+
+def country_trends(column, year_range):
+    """Cached trend fit of ``column`` for every country over ``year_range`` (read-only).
+
+    Fitted on the normalized values in percent, so slopes are percentage
+    points per year whether a country's rows are stored as 0-100 or 0-1.
+    """
+    year_range = tuple(year_range)
+    return _country_trends(data.range_version(year_range), column, year_range)
+
+
+@functools.lru_cache(maxsize=128)
+def _country_trends(range_version, column, year_range):
+    df = data.get_columns(["country", "year", column], normalized=True)
+    years = df["year"].to_numpy()
+    in_range = (years >= year_range[0]) & (years <= year_range[1])
+    values = df[column].to_numpy(dtype=np.float64)[in_range] * 100
+    return fit_trends(df["country"][in_range], years[in_range], values)
+
+
+def fastest_improvers(column, year_range, n=10, lower_is_better=False, min_r2=None):
+    """Top ``n`` countries by trend slope of ``column`` over ``year_range``.
+
+    "Improving" means rising, or falling when ``lower_is_better`` (dropout
+    rates).  ``min_r2`` drops countries whose trend explains too little of
+    their variation to be meaningful.
+    """
+    fit = country_trends(column, tuple(year_range))
+    fit = fit[fit["slope"].notna()]
+    if min_r2 is not None:
+        fit = fit[fit["r2"] >= min_r2]
+    improvement = -fit["slope"] if lower_is_better else fit["slope"]
+    order = np.argsort(-improvement.to_numpy(), kind="stable")[:n]
+    return fit.iloc[order]
+
+
+def merged_series(groups, years, values):
+    """Join per-group series into single (x, y, labels) arrays for one trace.
+
+    Rows must already be sorted by group, then year.  A NaN point separates
+    consecutive groups so Plotly breaks the line there; ``labels`` carries
+    the group name of every point for hover text.
+    """
+    groups = pd.Series(groups).astype("category")
+    codes = groups.cat.codes.to_numpy()
+    starts = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+    x = np.insert(np.asarray(years, dtype=np.float64), starts, np.nan)
+    y = np.insert(np.asarray(values, dtype=np.float64), starts, np.nan)
+    labels = np.insert(groups.astype(object).to_numpy(), starts, None)
+    return x, y, labels
+
+
+def country_percentiles(groups, years, values, year_range, low=10, high=90):
+    """Per-year ``low``/50/``high`` percentiles of ``values`` across groups.
+
+    Each group counts once per year (the mean of its rows for that year).
+    Returns a DataFrame with year, low, median and high columns, one row per
+    year in ``year_range`` with any data.
+    """
+    groups = pd.Series(groups).astype("category")
+    codes = groups.cat.codes.to_numpy()
+    years = np.asarray(years)
+    values = np.asarray(values, dtype=np.float64)
+    valid = (years >= year_range[0]) & (years <= year_range[1]) & (codes >= 0) & ~np.isnan(values)
+
+    n_years = year_range[1] - year_range[0] + 1
+    cells = codes[valid].astype(np.int64) * n_years + (years[valid] - year_range[0])
+    size = len(groups.cat.categories) * n_years
+    sums = np.bincount(cells, weights=values[valid], minlength=size)
+    counts = np.bincount(cells, minlength=size)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = (sums / counts).reshape(-1, n_years)
+
+    has_data = counts.reshape(-1, n_years).any(axis=0)
+    low_values, median, high_values = np.nanpercentile(means[:, has_data], [low, 50, high], axis=0)
+    return pd.DataFrame({
+        "year": np.arange(year_range[0], year_range[1] + 1)[has_data],
+        "low": low_values,
+        "median": median,
+        "high": high_values,
+    })
+
+
+def percentile_band(column, year_range, low=10, high=90):
+    """``country_percentiles`` of ``column`` over every country, in percent.
+
+    Computed on the normalized values, like the trend fits, so countries
+    stored as 0-1 shares and as 0-100 percentages share one scale.  Cached
+    and shared, so treat it as read-only.
+    """
+    year_range = tuple(year_range)
+    return _percentile_band(data.range_version(year_range), column, year_range, low, high)
+
+
+@functools.lru_cache(maxsize=128)
+def _percentile_band(range_version, column, year_range, low, high):
+    df = data.get_columns(["country", "year", column], normalized=True)
+    values = df[column].to_numpy(dtype=np.float64) * 100
+    return country_percentiles(df["country"], df["year"].to_numpy(), values, year_range, low, high)
+
+
+class SlopeTablePending(TimeoutError):
+    """The first slope table is still being built, or its last build failed."""
+
+
+class SlopeTable:
+    """Long-run slope of every ``TREND_COLUMNS`` column per country, kept current.
+
+    ``get()`` returns the latest snapshot, a dict with ``version`` (the
+    ``data.current_state()`` version it was built from), ``slopes`` (DataFrame
+    indexed by country, one slope column per metric in percentage points per
+    year, fitted on the normalized 0-1 shares), ``index_trends``
+    (country plus each ``INDEX_TRENDS`` column) and ``rankings`` of those.
+    Snapshots are replaced, never modified, so they are safe to share.
+    """
+
+    def __init__(self, columns=TREND_COLUMNS, poll_seconds=POLL_SECONDS):
+        self.columns = list(columns)
+        self.poll_seconds = poll_seconds
+        self._snapshot = None
+        self._error = None
+        self._fits = {}  # column -> (content digest, slopes Series)
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        """Start the background refresh thread (idempotent)."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="slope-table", daemon=True)
+                self._thread.start()
+
+    def get(self, timeout=None):
+        """Latest snapshot, waiting up to ``timeout`` seconds for the first one.
+
+        Raises ``SlopeTablePending`` if none is ready by then.
+        """
+        self.start()
+        if not self._ready.wait(timeout):
+            raise SlopeTablePending("Trend slope table is still being computed")
+        if self._snapshot is None:
+            # The background thread retries on its next poll
+            raise SlopeTablePending("Trend slope table build failed") from self._error
+        return self._snapshot
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+                self._error = None
+            except Exception as e:
+                # Keep serving the last good snapshot; retry on the next poll
+                self._error = e
+            self._ready.set()
+            time.sleep(self.poll_seconds)
+
+    def refresh(self):
+        """Rebuild the snapshot if the served dataset changed; return whether it did."""
+        state = data.current_state()
+        if self._snapshot is not None and self._snapshot["version"] == state.version:
+            return False
+
+        available = [c for c in self.columns if c in state.frame.columns]
+        # 0-1 shares like every index, so columns stored as percentages and as
+        # shares give comparable slopes
+        df = data.get_columns(["country", "year"] + available, normalized=True, state=state)
+        countries = df["country"]
+        years = df["year"].to_numpy()
+
+        # Rows are keyed by (country, year), so a column whose values and keys
+        # hash the same as last time has the same fit
+        keys = hashlib.sha256()
+        keys.update("\x00".join(map(str, countries.cat.categories)).encode("utf-8"))
+        keys.update(countries.cat.codes.to_numpy().tobytes())
+        keys.update(years.tobytes())
+
+        fits = {}
+        for column in available:
+            values = df[column].to_numpy()
+            digest = keys.copy()
+            digest.update(values.tobytes())
+            digest = digest.hexdigest()
+            if column in self._fits and self._fits[column][0] == digest:
+                fits[column] = self._fits[column]
+            else:
+                # Shares per year -> percentage points per year
+                fits[column] = (digest, fit_trends(countries, years, values)["slope"] * 100)
+        self._fits = fits
+
+        slopes = pd.DataFrame({column: fit for column, (_, fit) in fits.items()})
+        slopes.index.name = "country"
+        index_trends = pd.DataFrame({"country": slopes.index.astype(object)})
+        for name, columns in INDEX_TRENDS.items():
+            present = [c for c in columns if c in slopes.columns]
+            index_trends[name] = slopes[present].mean(axis=1).to_numpy() if present else np.nan
+        index_trends = index_trends.dropna(subset=list(INDEX_TRENDS), how="all").reset_index(drop=True)
+
+        self._snapshot = {
+            "version": state.version,
+            "slopes": slopes,
+            "index_trends": index_trends,
+            "rankings": ranking.rank_frame(index_trends, list(INDEX_TRENDS)),
+        }
+        return True
+
+
+SLOPE_TABLE = SlopeTable()
+
+
+def get_slope_table(timeout=None):
+    """Current snapshot of the shared background ``SLOPE_TABLE``.
+
+    Raises ``SlopeTablePending`` if it isn't available within ``timeout``.
+    """
+    return SLOPE_TABLE.get(timeout)
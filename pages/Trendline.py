@@ -1,12 +1,13 @@
 import streamlit as st
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
-import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+from plotly.colors import qualitative
 import numpy as np
 
+from dashboard import data, downloads, metrics, refresh, render, store, trends
+from dashboard.data import get_country_flag
+from dashboard.normalize import normalize_columns
+
 # Page configuration
 st.set_page_config(
     page_title="Education Trends Dashboard",
@@ -22,52 +23,6 @@ def load_css():
 
 load_css()
 
-# Country to flag emoji mapping
-def get_country_flag(country_name):
-    flag_map = {
-        "Afghanistan": "🇦🇫", "Albania": "🇦🇱", "Algeria": "🇩🇿", "Andorra": "🇦🇩", "Angola": "🇦🇴",
-        "Antigua and Barbuda": "🇦🇬", "Argentina": "🇦🇷", "Armenia": "🇦🇲", "Australia": "🇦🇺", "Austria": "🇦🇹",
-        "Azerbaijan": "🇦🇿", "Bahamas": "🇧🇸", "Bahrain": "🇧🇭", "Bangladesh": "🇧🇩", "Barbados": "🇧🇧",
-        "Belarus": "🇧🇾", "Belgium": "🇧🇪", "Belize": "🇧🇿", "Benin": "🇧🇯", "Bhutan": "🇧🇹",
-        "Bolivia": "🇧🇴", "Bosnia and Herzegovina": "🇧🇦", "Botswana": "🇧🇼", "Brazil": "🇧🇷", "Brunei": "🇧🇳",
-        "Bulgaria": "🇧🇬", "Burkina Faso": "🇧🇫", "Burundi": "🇧🇮", "Cambodia": "🇰🇭", "Cameroon": "🇨🇲",
-        "Canada": "🇨🇦", "Cape Verde": "🇨🇻", "Central African Republic": "🇨🇫", "Chad": "🇹🇩", "Chile": "🇨🇱",
-        "China": "🇨🇳", "Colombia": "🇨🇴", "Comoros": "🇰🇲", "Congo": "🇨🇬", "Costa Rica": "🇨🇷",
-        "Croatia": "🇭🇷", "Cuba": "🇨🇺", "Cyprus": "🇨🇾", "Czech Republic": "🇨🇿", "Democratic Republic of the Congo": "🇨🇩",
-        "Denmark": "🇩🇰", "Djibouti": "🇩🇯", "Dominica": "🇩🇲", "Dominican Republic": "🇩🇴", "East Timor": "🇹🇱",
-        "Ecuador": "🇪🇨", "Egypt": "🇪🇬", "El Salvador": "🇸🇻", "Equatorial Guinea": "🇬🇶", "Eritrea": "🇪🇷",
-        "Estonia": "🇪🇪", "Eswatini": "🇸🇿", "Ethiopia": "🇪🇹", "Fiji": "🇫🇯", "Finland": "🇫🇮",
-        "France": "🇫🇷", "Gabon": "🇬🇦", "Gambia": "🇬🇲", "Georgia": "🇬🇪", "Germany": "🇩🇪",
-        "Ghana": "🇬🇭", "Greece": "🇬🇷", "Grenada": "🇬🇩", "Guatemala": "🇬🇹", "Guinea": "🇬🇳",
-        "Guinea-Bissau": "🇬🇼", "Guyana": "🇬🇾", "Haiti": "🇭🇹", "Honduras": "🇭🇳", "Hungary": "🇭🇺",
-        "Iceland": "🇮🇸", "India": "🇮🇳", "Indonesia": "🇮🇩", "Iran": "🇮🇷", "Iraq": "🇮🇶",
-        "Ireland": "🇮🇪", "Israel": "🇮🇱", "Italy": "🇮🇹", "Ivory Coast": "🇨🇮", "Jamaica": "🇯🇲",
-        "Japan": "🇯🇵", "Jordan": "🇯🇴", "Kazakhstan": "🇰🇿", "Kenya": "🇰🇪", "Kiribati": "🇰🇮",
-        "Kuwait": "🇰🇼", "Kyrgyzstan": "🇰🇬", "Laos": "🇱🇦", "Latvia": "🇱🇻", "Lebanon": "🇱🇧",
-        "Lesotho": "🇱🇸", "Liberia": "🇱🇷", "Libya": "🇱🇾", "Lithuania": "🇱🇹", "Luxembourg": "🇱🇺",
-        "Macedonia": "🇲🇰", "Madagascar": "🇲🇬", "Malawi": "🇲🇼", "Malaysia": "🇲🇾", "Maldives": "🇲🇻",
-        "Mali": "🇲🇱", "Malta": "🇲🇹", "Marshall Islands": "🇲🇭", "Mauritania": "🇲🇷", "Mauritius": "🇲🇺",
-        "Mexico": "🇲🇽", "Micronesia": "🇫🇲", "Moldova": "🇲🇩", "Monaco": "🇲🇨", "Mongolia": "🇲🇳",
-        "Montenegro": "🇲🇪", "Morocco": "🇲🇦", "Mozambique": "🇲🇿", "Myanmar": "🇲🇲", "Namibia": "🇳🇦",
-        "Nauru": "🇳🇷", "Nepal": "🇳🇵", "Netherlands": "🇳🇱", "New Zealand": "🇳🇿", "Nicaragua": "🇳🇮",
-        "Niger": "🇳🇪", "Nigeria": "🇳🇬", "North Korea": "🇰🇵", "Norway": "🇳🇴", "Oman": "🇴🇲",
-        "Pakistan": "🇵🇰", "Palau": "🇵🇼", "Panama": "🇵🇦", "Papua New Guinea": "🇵🇬", "Paraguay": "🇵🇾",
-        "Peru": "🇵🇪", "Philippines": "🇵🇭", "Poland": "🇵🇱", "Portugal": "🇵🇹", "Qatar": "🇶🇦",
-        "Republic of the Congo": "🇨🇬", "Romania": "🇷🇴", "Russia": "🇷🇺", "Rwanda": "🇷🇼", "Saint Kitts and Nevis": "🇰🇳",
-        "Saint Lucia": "🇱🇨", "Saint Vincent and the Grenadines": "🇻🇨", "Samoa": "🇼🇸", "San Marino": "🇸🇲", "Sao Tome and Principe": "🇸🇹",
-        "Saudi Arabia": "🇸🇦", "Senegal": "🇸🇳", "Serbia": "🇷🇸", "Seychelles": "🇸🇨", "Sierra Leone": "🇸🇱",
-        "Singapore": "🇸🇬", "Slovakia": "🇸🇰", "Slovenia": "🇸🇮", "Solomon Islands": "🇸🇧", "Somalia": "🇸🇴",
-        "South Africa": "🇿🇦", "South Korea": "🇰🇷", "South Sudan": "🇸🇸", "Spain": "🇪🇸", "Sri Lanka": "🇱🇰",
-        "Sudan": "🇸🇩", "Suriname": "🇸🇷", "Sweden": "🇸🇪", "Switzerland": "🇨🇭", "Syria": "🇸🇾",
-        "Taiwan": "🇹🇼", "Tajikistan": "🇹🇯", "Tanzania": "🇹🇿", "Thailand": "🇹🇭", "Togo": "🇹🇬",
-        "Tonga": "🇹🇴", "Trinidad and Tobago": "🇹🇹", "Tunisia": "🇹🇳", "Turkey": "🇹🇷", "Turkmenistan": "🇹🇲",
-        "Tuvalu": "🇹🇻", "Uganda": "🇺🇬", "Ukraine": "🇺🇦", "United Arab Emirates": "🇦🇪", "United Kingdom": "🇬🇧",
-        "United States": "🇺🇸", "United States of America": "🇺🇸", "Uruguay": "🇺🇾", "Uzbekistan": "🇺🇿", "Vanuatu": "🇻🇺",
-        "Vatican City": "🇻🇦", "Venezuela": "🇻🇪", "Vietnam": "🇻🇳", "Yemen": "🇾🇪", "Zambia": "🇿🇲",
-        "Zimbabwe": "🇿🇼"
-    }
-    return flag_map.get(country_name, "🏳️")  # Return neutral flag if country not found
-
 # Header
 st.markdown("""
 <div class="main-header">
@@ -76,47 +31,28 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+# Define metric categories and submetrics
+index_map = trends.TREND_METRICS
+
+# Above this many selected countries the chart switches to a single WebGL trace
+HIGH_CARDINALITY_COUNTRIES = 12
+
+# A replaced education_data.csv is picked up in the background, without a restart
+refresh.DATASET_REFRESHER.start()
+
 # Load dataset
-@st.cache_data
 def load_data():
-    df = pd.read_csv("education_data.csv")
-    df["year"] = pd.to_numeric(df["year"], errors="coerce")
-    
-    # Fix country names
-    country_name_map = {
-        "Rep. of Korea": "South Korea",
-        "Rep. Moldova": "Moldova",
-        "Trinidad/Tobago": "Trinidad and Tobago",
-        "Viet Nam": "Vietnam",
-        "North Macedonia": "Macedonia",
-    }
-    df["country"] = df["country"].replace(country_name_map)
-    return df
+    # Only the columns this page can plot; some may be absent from the CSV
+    available_columns = set(data.load_dataset().columns)
+    metric_columns = [
+        column for submetrics in index_map.values() for column in submetrics.values()
+        if column in available_columns
+    ]
+    # View of the process-wide frame; country names are already normalized
+    return data.get_columns(["country", "year"] + metric_columns)
 
 df = load_data()
 
-# Define metric categories and submetrics
-index_map = {
-    "Dropout Index": {
-        "Primary Dropout Rate": "eduout_prim_m",
-        "Lower Secondary Dropout Rate": "eduout_lowsec_m",
-        "Upper Secondary Dropout Rate": "eduout_upsec_m",
-    },
-    "Completion Index": {
-        "Primary Completion Rate": "comp_prim_v2_m",
-        "Lower Secondary Completion Rate": "comp_lowsec_v2_m",
-        "Upper Secondary Completion Rate": "comp_upsec_v2_m",
-    },
-    "Attainment Index": {
-        "Primary Attainment Rate": "attain_prim_m",
-        "Lower Secondary Attainment Rate": "attain_lowsec_m",
-        "Upper Secondary Attainment Rate": "attain_upsec_m",
-    },
-    "Higher Ed Completion Index": {
-        "Higher Ed Completion Rate": "higher_ed_comp_v2_m"
-    }
-}
-
 # Sidebar with improved styling
 st.sidebar.markdown("## 🎛️ Dashboard Controls")
 
@@ -140,7 +76,7 @@ available_countries = sorted(df["country"].dropna().unique())
 selected_countries = st.sidebar.multiselect(
     "🌍 **Select Countries**",
     available_countries,
-    default=["South Korea", "United States", "Germany", "Japan"],
+    default=[c for c in ["South Korea", "United States of America", "Germany", "Japan"] if c in available_countries],
     help="Choose countries to compare (up to 8 recommended for clarity)"
 )
 
@@ -158,6 +94,15 @@ st.sidebar.markdown("### 📊 **Display Options**")
 show_markers = st.sidebar.checkbox("Show data points", value=True)
 show_grid = st.sidebar.checkbox("Show grid", value=True)
 show_confidence = st.sidebar.checkbox("Show trend lines", value=False)
+show_band = st.sidebar.checkbox(
+    "Show all-country range (p10–p90)", value=False,
+    help="Shade the 10th–90th percentile of every country in the dataset, with the median"
+)
+# One WebGL trace instead of one SVG trace per country keeps large selections responsive
+high_cardinality = st.sidebar.checkbox(
+    "Fast mode for many countries", value=False,
+    help=f"Draw all countries as a single WebGL trace (always on above {HIGH_CARDINALITY_COUNTRIES} countries)"
+) or len(selected_countries) > HIGH_CARDINALITY_COUNTRIES
 
 # Export functionality
 st.sidebar.markdown("### �� **Export Data**")
@@ -165,17 +110,23 @@ st.sidebar.markdown("### �� **Export Data**")
 # Download original dataset
 if st.sidebar.button("📊 Download Original Dataset", help="Download the complete education_data.csv file"):
     try:
-        with open("education_data.csv", 'r') as f:
-            csv_data = f.read()
-        
+        # Cached bytes shared by every session; the gzip copy is built on first use
         st.sidebar.download_button(
             label="💾 Download education_data.csv",
-            data=csv_data,
+            data=downloads.dataset_bytes(),
             file_name="education_data.csv",
             mime="text/csv",
             help="Download the complete original education dataset"
         )
         
+        st.sidebar.download_button(
+            label="🗜️ Download education_data.csv.gz",
+            data=downloads.dataset_bytes(compress=True),
+            file_name="education_data.csv.gz",
+            mime="application/gzip",
+            help="Download the original dataset gzip-compressed (same contents, smaller file)"
+        )
+        
         st.sidebar.success("✅ Original dataset ready for download!")
     except FileNotFoundError:
         st.sidebar.error("❌ education_data.csv file not found")
@@ -202,8 +153,8 @@ if st.sidebar.button("📊 Export to CSV", help="Download the current filtered d
             selected_submetric_column: selected_submetric_label
         })
         
-        # Convert to CSV
-        csv_data = df_export_clean.to_csv(index=False)
+        # Convert to CSV (float32 values written as they appear in the source CSV)
+        csv_data = store.widen_floats(df_export_clean).to_csv(index=False)
         
         # Create download button
         st.sidebar.download_button(
@@ -230,75 +181,187 @@ with col1:
         (df["year"] >= year_range[0]) & 
         (df["year"] <= year_range[1])
     ]
+    if selected_submetric_column in df_filtered.columns:
+        # Plot on the 0-100 scale of the trend fits; some countries store 0-1 shares
+        df_filtered = normalize_columns(
+            df_filtered[["country", "year", selected_submetric_column]], [selected_submetric_column]
+        )
+        df_filtered[selected_submetric_column] *= 100
     
-    if not df_filtered.empty and selected_submetric_column in df_filtered.columns:
-        # Create interactive plot with Plotly
-        fig = go.Figure()
-        
-        # Color palette
-        colors = px.colors.qualitative.Set3
-        
-        for i, country in enumerate(selected_countries):
-            country_df = df_filtered[df_filtered["country"] == country].sort_values("year")
-            if not country_df.empty:
-                color = colors[i % len(colors)]
-                
-                # Main line
+    has_series = not df_filtered.empty and selected_submetric_column in df_filtered.columns
+    # The all-country band doesn't depend on the selection, so it is drawn
+    # even when no countries are selected
+    has_band = show_band and selected_submetric_column in df.columns
+    
+    if has_series or has_band:
+        # Create interactive plot with Plotly; identical views share one built figure
+        def build_trend_figure():
+            fig = go.Figure()
+            
+            # Color palette
+            colors = qualitative.Set3
+            
+            # Distribution of every country in the dataset, drawn underneath
+            if has_band:
+                band = trends.percentile_band(selected_submetric_column, year_range)
+                fig.add_trace(go.Scatter(
+                    x=band["year"],
+                    y=band["high"],
+                    mode='lines',
+                    line=dict(width=0),
+                    hoverinfo='skip',
+                    showlegend=False
+                ))
+                fig.add_trace(go.Scatter(
+                    x=band["year"],
+                    y=band["low"],
+                    mode='lines',
+                    name='All countries (p10–p90)',
+                    fill='tonexty',
+                    fillcolor='rgba(127, 140, 141, 0.2)',
+                    line=dict(width=0),
+                    hoverinfo='skip'
+                ))
                 fig.add_trace(go.Scatter(
-                    x=country_df["year"],
-                    y=country_df[selected_submetric_column],
+                    x=band["year"],
+                    y=band["median"],
+                    mode='lines',
+                    name='All countries (median)',
+                    line=dict(color='#7f8c8d', width=2, dash='dot'),
+                    hovertemplate='Median: %{y:.2f}%<extra></extra>'
+                ))
+            
+            if has_series and high_cardinality:
+                # Every country in one Scattergl trace, separated by gaps
+                plot_df = df_filtered.sort_values(["country", "year"])
+                x, y, names = trends.merged_series(
+                    plot_df["country"], plot_df["year"], plot_df[selected_submetric_column]
+                )
+                fig.add_trace(go.Scattergl(
+                    x=x,
+                    y=y,
+                    customdata=names,
                     mode='lines+markers' if show_markers else 'lines',
-                    name=country,
-                    line=dict(color=color, width=3),
-                    marker=dict(size=8, color=color),
-                    hovertemplate=f'<b>{country}</b><br>' +
+                    name=f'{len(selected_countries)} countries',
+                    line=dict(color=colors[3], width=1.5),
+                    marker=dict(size=4, color=colors[3]),
+                    opacity=0.7,
+                    hovertemplate='<b>%{customdata}</b><br>' +
                                 'Year: %{x}<br>' +
                                 f'{selected_submetric_label}: %{{y:.2f}}%<br>' +
                                 '<extra></extra>'
                 ))
                 
-                # Add trend line if requested
-                if show_confidence and len(country_df) > 2:
-                    z = np.polyfit(country_df["year"], country_df[selected_submetric_column], 1)
-                    p = np.poly1d(z)
-                    fig.add_trace(go.Scatter(
-                        x=country_df["year"],
-                        y=p(country_df["year"]),
+                # Straight trend lines only need their end points: one trace for all
+                if show_confidence:
+                    trend_fit = trends.country_trends(selected_submetric_column, year_range)
+                    trend_fit = trend_fit[trend_fit.index.isin(selected_countries)]
+                    ends = trend_fit[["first_year", "last_year"]].to_numpy(dtype=np.float64)
+                    fitted = trend_fit["intercept"].to_numpy()[:, None] + trend_fit["slope"].to_numpy()[:, None] * ends
+                    gaps = np.full((len(trend_fit), 1), np.nan)
+                    fig.add_trace(go.Scattergl(
+                        x=np.hstack([ends, gaps]).ravel(),
+                        y=np.hstack([fitted, gaps]).ravel(),
                         mode='lines',
-                        name=f'{country} (Trend)',
-                        line=dict(color=color, width=1, dash='dash'),
+                        name='Trends',
+                        line=dict(color='#2c3e50', width=1, dash='dash'),
+                        hoverinfo='skip',
                         showlegend=False
                     ))
+            elif has_series:
+                # Split once instead of re-filtering the frame for every country
+                country_series = {
+                    country: country_df
+                    for country, country_df in df_filtered.sort_values("year").groupby("country", observed=True)
+                }
+                
+                # All trend lines come from one batched least-squares fit
+                if show_confidence:
+                    trend_fit = trends.country_trends(selected_submetric_column, year_range)
+                
+                for i, country in enumerate(selected_countries):
+                    country_df = country_series.get(country)
+                    if country_df is not None and not country_df.empty:
+                        color = colors[i % len(colors)]
+                    
+                        # Main line
+                        fig.add_trace(go.Scatter(
+                            x=country_df["year"],
+                            y=country_df[selected_submetric_column],
+                            mode='lines+markers' if show_markers else 'lines',
+                            name=country,
+                            line=dict(color=color, width=3),
+                            marker=dict(size=8, color=color),
+                            hovertemplate=f'<b>{country}</b><br>' +
+                                        'Year: %{x}<br>' +
+                                        f'{selected_submetric_label}: %{{y:.2f}}%<br>' +
+                                        '<extra></extra>'
+                        ))
+                    
+                        # Add trend line and its 95% confidence band if requested
+                        if show_confidence and country in trend_fit.index:
+                            country_fit = trend_fit.loc[[country]]
+                            trend_years = np.arange(country_fit["first_year"].iloc[0], country_fit["last_year"].iloc[0] + 1)
+                            fitted, lower, upper = trends.trend_band(country_fit, trend_years)
+                            fig.add_trace(go.Scatter(
+                                x=np.concatenate([trend_years, trend_years[::-1]]),
+                                y=np.concatenate([upper[0], lower[0][::-1]]),
+                                fill='toself',
+                                fillcolor=color,
+                                opacity=0.15,
+                                line=dict(width=0),
+                                hoverinfo='skip',
+                                showlegend=False
+                            ))
+                            fig.add_trace(go.Scatter(
+                                x=trend_years,
+                                y=fitted[0],
+                                mode='lines',
+                                name=f'{country} (Trend)',
+                                line=dict(color=color, width=1, dash='dash'),
+                                showlegend=False
+                            ))
+                
+            # Update layout
+            fig.update_layout(
+                title=dict(
+                    text=f"{selected_submetric_label} Over Time",
+                    font=dict(size=20, color='#2c3e50'),
+                    x=0.5
+                ),
+                xaxis=dict(
+                    title="Year",
+                    gridcolor='lightgray' if show_grid else 'rgba(0,0,0,0)',
+                    showgrid=show_grid
+                ),
+                yaxis=dict(
+                    title=f"{selected_submetric_label} (%)",
+                    gridcolor='lightgray' if show_grid else 'rgba(0,0,0,0)',
+                    showgrid=show_grid
+                ),
+                plot_bgcolor='white',
+                paper_bgcolor='white',
+                hovermode='closest' if high_cardinality else 'x unified',
+                legend=dict(
+                    orientation="h",
+                    yanchor="bottom",
+                    y=1.02,
+                    xanchor="right",
+                    x=1
+                ),
+                margin=dict(l=50, r=50, t=80, b=50)
+            )
+            return fig
         
-        # Update layout
-        fig.update_layout(
-            title=dict(
-                text=f"{selected_submetric_label} Over Time",
-                font=dict(size=20, color='#2c3e50'),
-                x=0.5
-            ),
-            xaxis=dict(
-                title="Year",
-                gridcolor='lightgray' if show_grid else 'rgba(0,0,0,0)',
-                showgrid=show_grid
-            ),
-            yaxis=dict(
-                title=f"{selected_submetric_label} (%)",
-                gridcolor='lightgray' if show_grid else 'rgba(0,0,0,0)',
-                showgrid=show_grid
-            ),
-            plot_bgcolor='white',
-            paper_bgcolor='white',
-            hovermode='x unified',
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            ),
-            margin=dict(l=50, r=50, t=80, b=50)
-        )
+        with metrics.timed("trend_figure"):
+            fig = render.RENDER_CACHE.get(
+                (
+                    "trend_figure", selected_submetric_column, year_range, data.range_version(year_range),
+                    tuple(selected_countries),
+                    show_markers, show_grid, show_confidence, show_band, high_cardinality
+                ),
+                build_trend_figure
+            )
         
         st.plotly_chart(fig, use_container_width=True)
         
@@ -315,22 +378,55 @@ with col2:
     
     if not df_filtered.empty and selected_submetric_column in df_filtered.columns:
         # Calculate statistics
-        stats_df = df_filtered.groupby('country')[selected_submetric_column].agg([
+        # float64 before rounding: the stored float32 values would print as 23.969999313354492
+        stats_df = df_filtered.groupby('country', observed=True)[selected_submetric_column].agg([
             'mean', 'min', 'max', 'std'
-        ]).round(2)
+        ]).astype("float64").round(2)
+        
+        # Long-run slope over all years, from the background slope table; "n/a"
+        # while its first build is running or if the build failed
+        try:
+            slope_table = trends.get_slope_table(timeout=trends.SLOPE_WAIT_SECONDS)
+            long_run_slopes = slope_table["slopes"].get(selected_submetric_column)
+        except trends.SlopeTablePending:
+            long_run_slopes = None
         
         for country in selected_countries:
             if country in stats_df.index:
                 stats = stats_df.loc[country]
+                slope = long_run_slopes.get(country) if long_run_slopes is not None else None
+                trend_text = f"{slope:+.2f} pts/year" if slope is not None and pd.notna(slope) else "n/a"
                 st.markdown(f"""
                 <div class="metric-card">
                     <h4>{get_country_flag(country)} {country}</h4>
                     <p><strong>Average:</strong> {stats['mean']}%</p>
                     <p><strong>Range:</strong> {stats['min']}% - {stats['max']}%</p>
                     <p><strong>Variability:</strong> {stats['std']}%</p>
+                    <p><strong>Long-run trend:</strong> {trend_text}</p>
                 </div>
                 """, unsafe_allow_html=True)
     
+    # Leaderboard over every country, from the same cached batched fit
+    st.markdown("## 🚀 Fastest Improvers")
+    
+    improvers = pd.DataFrame()
+    if selected_submetric_column in df.columns:
+        improvers = trends.fastest_improvers(
+            selected_submetric_column, year_range, n=5, lower_is_better=index_category == "Dropout Index"
+        )
+    
+    if not improvers.empty:
+        for position, (country, fit) in enumerate(improvers.iterrows(), start=1):
+            st.markdown(f"""
+            <div class="metric-card">
+                <h4>{position}. {get_country_flag(country)} {country}</h4>
+                <p><strong>Trend:</strong> {fit['slope']:+.2f} pts/year ({int(fit['first_year'])}–{int(fit['last_year'])})</p>
+                <p><strong>Fit (R²):</strong> {fit['r2']:.2f}</p>
+            </div>
+            """, unsafe_allow_html=True)
+    else:
+        st.info("Not enough data to estimate trends for this period.")
+    
     st.markdown("## ℹ️ About This Metric")
     
     metric_descriptions = {
@@ -362,3 +458,6 @@ st.markdown("""
     <p>📊 Global Education Disparity Trends Dashboard | Data Source: World Bank Education Statistics</p>
 </div>
 """, unsafe_allow_html=True)
+
+# Stage timings and cache counters (shown with ?debug=1)
+metrics.debug_panel()
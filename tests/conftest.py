@@ -0,0 +1,34 @@
+import sys
+
+import pytest
+
+from dashboard import data
+
+
+def clear_dashboard_caches():
+    """Empty every per-process cache in the dashboard package."""
+    for name, module in list(sys.modules.items()):
+        if name.startswith("dashboard."):
+            for value in list(vars(module).values()):
+                if callable(getattr(value, "cache_clear", None)):
+                    value.cache_clear()
+    # The served dataset is loaded again on next use
+    data.swap_state(None)
+
+
+@pytest.fixture
+def dataset(tmp_path, monkeypatch):
+    """Serve the DataFrame passed to the returned function as education_data.csv.
+
+    Dataset columns it lacks are written empty.
+    """
+    monkeypatch.chdir(tmp_path)
+    clear_dashboard_caches()
+
+    def write(df):
+        df = df.reindex(columns=list(df.columns) + [c for c in data.DATASET_COLUMNS if c not in df.columns])
+        df.to_csv(tmp_path / "education_data.csv", index=False)
+        clear_dashboard_caches()
+
+    yield write
+    clear_dashboard_caches()
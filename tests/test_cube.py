@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+from dashboard import cube, data
+
+
+def _dataset(seed=0):
+    rng = np.random.default_rng(seed)
+    countries = ["Chile", "Kenya", "Nepal", "Peru", "Fiji"]
+    years = np.arange(2000, 2011)
+    frame = {
+        "country": pd.Categorical(np.repeat(countries, len(years))),
+        "year": np.tile(years, len(countries)).astype(np.int16),
+    }
+    rows = len(frame["year"])
+    for column in data.DATASET_COLUMNS[2:]:
+        # Mix 0-100 percentages and 0-1 shares, with gaps
+        values = rng.uniform(0, 100, rows)
+        values[::3] /= 100
+        values[rng.random(rows) < 0.3] = np.nan
+        frame[column] = values.astype(np.float32)
+    return pd.DataFrame(frame)
+
+
+def _reference_index(df, index_name, year_range):
+    """The map page's filter + groupby computation the cube replaces."""
+    columns = cube.INDEX_COLUMNS[index_name]
+    df = df[df["year"].between(*year_range)].copy()
+    df["country"] = df["country"].astype(str)
+    df[columns] = df[columns].astype(np.float64)
+    df = df.dropna(subset=columns)
+    if index_name in cube.LATEST_ONLY_INDICES:
+        df = df.sort_values("year", ascending=False, kind="stable").drop_duplicates("country")
+    df[columns] = df[columns].where(df[columns] <= 1.0, df[columns] / 100)
+    means = df.groupby("country")[columns].mean()
+    return means.mean(axis=1)
+
+
+def test_index_frame_matches_groupby():
+    df = _dataset()
+    index_cube = cube.IndexCube(df)
+    for year_range in [(2000, 2010), (2003, 2005), (2007, 2007), (1990, 2001), (2012, 2015)]:
+        frame = index_cube.index_frame(year_range).set_index("country")
+        for index_name in cube.INDEX_COLUMNS:
+            expected = _reference_index(df, index_name, year_range)
+            actual = frame[index_name].dropna()
+            assert sorted(actual.index) == sorted(expected.index)
+            np.testing.assert_allclose(actual[expected.index], expected, rtol=1e-12)
+
+
+def test_updated_cube_matches_full_build():
+    old = _dataset()
+    new = old.copy()
+    edited = new["country"].isin(["Kenya", "Fiji"]) & new["year"].between(2004, 2006)
+    new.loc[edited, "comp_prim_v2_m"] = 42.0
+    new.loc[edited, "eduout_prim_m"] = np.nan
+
+    updated = cube.IndexCube(old).updated(new, ["Kenya", "Fiji"])
+    full = cube.IndexCube(new)
+    for start in range(2000, 2011):
+        for end in range(start, 2011):
+            pd.testing.assert_frame_equal(
+                updated.index_frame((start, end), drop_empty=False),
+                full.index_frame((start, end), drop_empty=False),
+            )
+
+
+def test_updated_cube_needs_full_build_for_new_years():
+    old = _dataset()
+    new = pd.concat([old, old[old["year"] == 2010].assign(year=np.int16(2011))], ignore_index=True)
+    assert cube.IndexCube(old).updated(new, ["Kenya"]) is None
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard import data
+
+REGION_COLUMNS = list(data.REGION_GROUPINGS)
+
+
+def _listed(region_col):
+    """(country, region) pairs as they appear in the region lists."""
+    return [
+        (country, region)
+        for region, countries in data.REGION_GROUPINGS[region_col].items()
+        for country in countries
+    ]
+
+
+@pytest.mark.parametrize("region_col", REGION_COLUMNS)
+def test_assign_regions_matches_isin_loop(region_col):
+    listed = [country for country, _ in _listed(region_col)]
+    countries = pd.Series(listed[::3] + ["Atlantis", None, listed[0]] * 2, index=np.arange(100, 100 + len(listed[::3]) + 6))
+
+    # The per-region isin loop the page used before
+    expected = pd.Series(data.OTHER_REGION, index=countries.index)
+    for region, members in data.REGION_GROUPINGS[region_col].items():
+        expected[countries.isin(members)] = region
+
+    regions = data.assign_regions(countries, region_col)
+    assert regions.name == region_col
+    assert list(regions.cat.categories) == sorted(regions.cat.categories)
+    pd.testing.assert_series_equal(regions.astype(object), expected.rename(region_col), check_dtype=False)
+
+
+@pytest.mark.parametrize("region_col", REGION_COLUMNS)
+def test_region_list_countries_resolve(region_col):
+    # A country listed under two regions takes the later one
+    expected = dict(_listed(region_col))
+    countries = pd.Series(list(expected))
+    # Under their listed spelling and after the dataset's name normalization
+    for names in (countries, data.normalize_country_names(countries).astype(object)):
+        regions = data.assign_regions(names, region_col)
+        assert list(regions.astype(object)) == list(expected.values())
+
+
+def test_flag_countries_resolve():
+    countries = pd.Series(list(data.COUNTRY_FLAGS))
+    for names in (countries, data.normalize_country_names(countries).astype(object)):
+        assert [name for name in names if data.get_country_flag(name) == "🏳️"] == []
+
+
+@pytest.mark.parametrize("raw, name, region, economic, flag", [
+    ("U. R. Tanzania", "United Republic of Tanzania", "Africa", "Lower Middle Income", "🇹🇿"),
+    ("CГҧte d'Ivoire", "Ivory Coast", "Africa", "Lower Middle Income", "🇨🇮"),
+    ("United States", "United States of America", "Americas", "High Income", "🇺🇸"),
+])
+def test_dataset_spellings_resolve(raw, name, region, economic, flag):
+    normalized = data.normalize_country_names(pd.Series([raw]))
+    assert list(normalized) == [name]
+    assert data.assign_regions(normalized, "geographic_region").iloc[0] == region
+    assert data.assign_regions(normalized, "economic_region").iloc[0] == economic
+    assert data.get_country_flag(name) == flag
+
+
+def _frame(rows):
+    return pd.DataFrame(rows, columns=["country", "year", "comp_prim_v2_m"])
+
+
+def test_changed_rows():
+    old = _frame([("Chile", 2015, 1.0), ("Chile", 2016, 2.0), ("Peru", 2015, 3.0)])
+    new = _frame([("Chile", 2015, 1.0), ("Chile", 2016, 2.5), ("Nepal", 2020, 4.0)])
+
+    changed = data.changed_rows(old, new)
+    assert sorted(map(tuple, changed.to_numpy().tolist())) == [("Chile", 2016), ("Nepal", 2020), ("Peru", 2015)]
+    assert data.changed_rows(old, old.copy()).empty
+    assert data.changed_rows(old, new.drop(columns="comp_prim_v2_m")) is None
+
+
+def test_range_version_follows_changed_years():
+    old = _frame([("Chile", year, 1.0) for year in range(2010, 2020)])
+    new = old.copy()
+    new.loc[new["year"] == 2012, "comp_prim_v2_m"] = 2.0
+
+    state = data.next_state(data.DatasetState("v1", old), "v2", new)
+    assert state.generation == 1
+    assert state.range_version((2010, 2014)) == 1
+    assert state.range_version((2015, 2019)) == 0
+
+    # New columns: nothing carries over
+    rebuilt = data.next_state(state, "v3", new.assign(comp_lowsec_v2_m=1.0))
+    assert rebuilt.range_version((2015, 2019)) == 2
+    assert rebuilt.previous is None
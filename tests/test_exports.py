@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from dashboard import exports
+
+
+def _build(size, calls):
+    def build():
+        calls.append(size)
+        return b"x" * size, size
+    return build
+
+
+def test_export_cache_evicts_least_recently_used_by_bytes():
+    cache = exports.ExportCache(max_bytes=100)
+    calls = []
+    cache.get("a", _build(40, calls))
+    cache.get("b", _build(40, calls))
+    # Touch "a" so "b" is the least recently used
+    assert cache.get("a", _build(40, calls)) == (b"x" * 40, 40)
+    assert calls == [40, 40]
+
+    cache.get("c", _build(30, calls))
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["bytes"] == 70
+    assert (stats["hits"], stats["misses"]) == (1, 3)
+
+    # "b" was evicted and is rebuilt; "a" is still cached
+    cache.get("a", _build(40, calls))
+    cache.get("b", _build(40, calls))
+    assert calls == [40, 40, 30, 40]
+    assert cache.stats()["bytes"] <= 100
+
+
+def test_export_cache_skips_oversized_payloads():
+    cache = exports.ExportCache(max_bytes=100)
+    calls = []
+    cache.get("small", _build(10, calls))
+    assert cache.get("big", _build(200, calls)) == (b"x" * 200, 200)
+    cache.get("big", _build(200, calls))
+    assert calls == [10, 200, 200]
+    assert cache.stats()["entries"] == 1
+    assert cache.stats()["bytes"] == 10
+
+
+def test_export_file_writes_source_decimals():
+    df = pd.DataFrame({"country": ["Peru"], "value": np.array([23.97], dtype=np.float32)})
+    payload, rows = exports.export_file("test", ("Peru",), lambda: df, cache=exports.ExportCache())
+    assert rows == 1
+    assert payload == b"country,value\nPeru,23.97\n"
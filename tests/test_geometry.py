@@ -0,0 +1,120 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from dashboard import geometry
+
+TOLERANCES = [tolerance for _, tolerance in geometry.RESOLUTIONS]
+
+
+def _rings(feature):
+    for polygon in geometry._polygons(feature["geometry"]):
+        yield from polygon
+
+
+def _points(feature):
+    return {tuple(point) for ring in _rings(feature) for point in ring}
+
+
+def _wiggly_line(start, end, n=50, amplitude=0.01):
+    t = np.linspace(0, 1, n)[:, None]
+    points = np.asarray(start) + t * (np.asarray(end) - np.asarray(start))
+    points[1:-1] += amplitude * np.sin(np.arange(1, n - 1) * 1.7)[:, None]
+    return [[round(x, 6), round(y, 6)] for x, y in points]
+
+
+@pytest.fixture
+def neighbours(tmp_path):
+    """Two countries sharing a detailed border, plus a tiny island."""
+    border = _wiggly_line([10, 0], [10, 10])
+    west = [[0, 0]] + border + [[0, 10], [0, 0]]
+    east = [border[-1]] + border[::-1][1:] + [[20, 0], [20, 10], border[-1]]
+    island = [[30, 0], [30.001, 0], [30.001, 0.001], [30, 0.001], [30, 0]]
+    features = [
+        {"type": "Feature", "properties": {"name": "West"},
+         "geometry": {"type": "Polygon", "coordinates": [west]}},
+        {"type": "Feature", "properties": {"name": "East"},
+         "geometry": {"type": "MultiPolygon", "coordinates": [[east], [island]]}},
+    ]
+    path = tmp_path / "countries.json"
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": features}))
+    return str(path)
+
+
+def test_simplified_rings_stay_closed(neighbours):
+    for tolerance in TOLERANCES:
+        simplified = geometry.simplified_geojson(tolerance, neighbours)
+        assert [f["properties"] for f in simplified["features"]] == [{"name": "West"}, {"name": "East"}]
+        for feature in simplified["features"]:
+            for ring in _rings(feature):
+                assert len(ring) >= 4
+                assert ring[0] == ring[-1]
+
+
+def test_shared_border_stays_shared(neighbours):
+    source = geometry.load_geojson(neighbours)
+    source_border = _points(source["features"][0]) & _points(source["features"][1])
+    simplified = geometry.simplified_geojson(0.5, neighbours)
+    west, east = (_points(feature) for feature in simplified["features"])
+
+    # The border is simplified, and both countries keep exactly the same points
+    shared = west & east
+    assert {(10, 0), (10, 10)} <= shared
+    assert len(shared) < len(source_border)
+    assert {p for p in west if p[0] > 9} == shared
+
+
+@pytest.mark.skipif(not os.path.exists(geometry.GEOJSON_PATH), reason="world-countries.json not present")
+def test_world_countries_rings_stay_closed():
+    source = geometry.load_geojson()
+    for tolerance in TOLERANCES:
+        simplified = geometry.simplified_geojson(tolerance)
+        assert len(simplified["features"]) == len(source["features"])
+        for feature in simplified["features"]:
+            for ring in _rings(feature):
+                assert len(ring) >= 4
+                assert ring[0] == ring[-1]
+
+
+def _square(x, y, size):
+    return [[x, y], [x + size, y], [x + size, y + size], [x, y + size], [x, y]]
+
+
+def test_country_centroids(tmp_path):
+    features = [
+        # Centroid of the polygon, not the mean of its vertices
+        {"properties": {"name": "Wedge"},
+         "geometry": {"type": "Polygon", "coordinates": [[[0, 0], [4, 0], [4, 1], [3, 1], [2, 1], [1, 1], [0, 1], [0, 0]]]}},
+        # The hole moves the centroid right
+        {"properties": {"name": "Holed"},
+         "geometry": {"type": "Polygon", "coordinates": [_square(10, 0, 4), _square(10, 1, 2)[::-1]]}},
+        # Largest polygon only
+        {"properties": {"name": "Islands"},
+         "geometry": {"type": "MultiPolygon", "coordinates": [[_square(50, 50, 1)], [_square(20, 20, 2)]]}},
+    ]
+    path = tmp_path / "countries.json"
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": features}))
+    cache_path = str(tmp_path / "cache" / "centroids.json")
+
+    centroids = geometry.country_centroids(str(path), cache_path)
+    assert set(centroids) == {"Wedge", "Holed", "Islands"}
+    np.testing.assert_allclose(centroids["Wedge"], (0.5, 2.0))
+    np.testing.assert_allclose(centroids["Holed"], (2.0, 37 / 3))
+    np.testing.assert_allclose(centroids["Islands"], (21.0, 21.0))
+
+    # Read back from disk while the GeoJSON is unchanged
+    geometry.country_centroids.cache_clear()
+    with open(cache_path) as f:
+        cached = json.load(f)
+    cached["centroids"]["Wedge"] = [-1, -1]
+    with open(cache_path, "w") as f:
+        json.dump(cached, f)
+    assert geometry.country_centroids(str(path), cache_path)["Wedge"] == (-1, -1)
+
+    # Recomputed once the GeoJSON changes
+    geometry.country_centroids.cache_clear()
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    np.testing.assert_allclose(geometry.country_centroids(str(path), cache_path)["Wedge"], (0.5, 2.0))
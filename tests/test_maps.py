@@ -0,0 +1,11 @@
+import pytest
+
+from dashboard import maps, trends
+
+
+def test_metric_data_pending_without_slope_table(tmp_path, monkeypatch):
+    # No education_data.csv here, so the slope table never becomes ready
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(trends, "SLOPE_TABLE", trends.SlopeTable(poll_seconds=3600))
+    with pytest.raises(trends.SlopeTablePending):
+        maps.metric_data("completion_trend", (2015, 2024), timeout=0.5)
@@ -0,0 +1,39 @@
+import pandas as pd
+
+from dashboard import metrics
+
+
+def test_timed_records_every_call():
+    registry = metrics.StageMetrics()
+    for _ in range(3):
+        with registry.timed("stage"):
+            pass
+
+    entry = registry.stages()["stage"]
+    assert entry["calls"] == 3
+    assert entry["max_seconds"] <= entry["total_seconds"]
+    assert entry["last_seconds"] <= entry["max_seconds"]
+
+
+def test_timed_records_failed_stages():
+    registry = metrics.StageMetrics()
+    try:
+        with registry.timed("stage"):
+            raise ValueError
+    except ValueError:
+        pass
+
+    assert registry.stages()["stage"]["calls"] == 1
+
+
+def test_prometheus_exposition(dataset):
+    # The snapshot reports the served dataset version
+    dataset(pd.DataFrame({"country": ["Peru"], "year": [2015]}))
+    metrics.METRICS.clear()
+    with metrics.timed("test_stage"):
+        pass
+
+    text = metrics.to_prometheus()
+    assert "# TYPE dashboard_stage_calls_total counter" in text
+    assert 'dashboard_stage_calls_total{stage="test_stage"} 1' in text
+    assert 'dashboard_cache_hits_total{cache="render"}' in text
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from dashboard.normalize import normalize_columns, normalize_percentages
+
+
+def _lambda(values):
+    """The per-cell lambda the pages used before."""
+    return pd.Series(values).apply(lambda x: x / 100 if pd.notna(x) and x > 1.0 else x).to_numpy()
+
+
+def _values(dtype):
+    rng = np.random.default_rng(0)
+    values = rng.uniform(0, 100, 500)
+    values[::3] /= 100
+    values[::7] = np.nan
+    values[:6] = [0.0, 1.0, 1.0000001, 100.0, 0.5, np.nan]
+    return values.astype(dtype)
+
+
+def test_normalize_percentages_matches_lambda():
+    for dtype in (np.float32, np.float64):
+        values = _values(dtype)
+        result = normalize_percentages(values)
+        np.testing.assert_array_equal(result, _lambda(values).astype(result.dtype))
+        assert result.dtype == dtype
+        # The input is copied unless out= is given
+        np.testing.assert_array_equal(values, _values(dtype))
+
+
+def test_normalize_percentages_in_place():
+    values = _values(np.float64)
+    expected = _lambda(values)
+    assert normalize_percentages(values, out=values) is values
+    np.testing.assert_array_equal(values, expected)
+
+
+def test_normalize_percentages_integers():
+    result = normalize_percentages(np.array([0, 1, 2, 50]))
+    np.testing.assert_array_equal(result, [0.0, 1.0, 0.02, 0.5])
+
+
+def test_normalize_columns_leaves_shared_data_alone():
+    source = pd.DataFrame({
+        "country": ["A", "B", "C"],
+        "a": np.array([50.0, 0.5, np.nan], dtype=np.float32),
+        "b": [1.0, 2.0, 300.0],
+    })
+    view = source[["country", "a", "b"]]
+    result = normalize_columns(view, ["a", "b"])
+
+    for column in ("a", "b"):
+        np.testing.assert_array_equal(result[column], _lambda(source[column]).astype(result[column].dtype))
+    assert source["a"].tolist()[:2] == [50.0, 0.5]
+    assert source["b"].tolist() == [1.0, 2.0, 300.0]
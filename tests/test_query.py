@@ -0,0 +1,42 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard import query
+
+
+def test_json_keeps_float32_values_as_written():
+    df = pd.DataFrame({"country": ["Chile"], "value": np.array([23.97], dtype=np.float32)})
+
+    assert json.loads(query.serialize(df, "json")) == [{"country": "Chile", "value": 23.97}]
+
+
+def test_rankings_cli(dataset, capsys):
+    dataset(pd.DataFrame({
+        "country": ["Chile", "Chile", "Peru", "Peru"],
+        "year": [2015, 2016, 2015, 2016],
+        "eduout_prim_m": [10.0, 20.0, 5.0, 6.0],
+        "eduout_lowsec_m": [10.0, 20.0, 5.0, 6.0],
+        "eduout_upsec_m": [10.0, 20.0, 5.0, 6.0],
+    }))
+
+    query.main(["rankings", "--metric", "Dropout Index", "--year-range", "2015", "2016", "--format", "json"])
+
+    rows = json.loads(capsys.readouterr().out)
+    # Same order as the Map page: highest value first
+    assert [(row["Rank"], row["Country"]) for row in rows] == [(1, "Chile"), (2, "Peru")]
+
+
+def test_trend_series_in_percent(dataset):
+    dataset(pd.DataFrame({
+        "country": ["Peru", "Peru", "Chile", "Chile"],
+        "year": [2015, 2016, 2015, 2016],
+        # Peru is stored in percent, Chile as 0-1 shares
+        "comp_prim_v2_m": [40.0, 41.0, 0.40, 0.41],
+    }))
+
+    series = query.trend_series("comp_prim_v2_m", (2015, 2016), ["Chile"])
+    assert series["country"].tolist() == ["Chile", "Chile"]
+    assert series["comp_prim_v2_m"].tolist() == pytest.approx([40.0, 41.0])
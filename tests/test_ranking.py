@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard import ranking
+
+
+def _index_frame():
+    # Ties, a missing value and countries not in name order
+    return pd.DataFrame({
+        "country": ["Peru", "Chile", "Kenya", "Brazil", "Nepal", "Angola", "Fiji"],
+        "a": [0.5, 0.7, 0.5, np.nan, 0.7, 0.2, 0.5],
+        "b": [3.0, 1.0, 2.0, 2.0, 5.0, 4.0, 2.0],
+    })
+
+
+@pytest.mark.parametrize("ascending", [False, True])
+def test_rank_frame_matches_pandas_rank(ascending):
+    df = _index_frame()
+    rankings = ranking.rank_frame(df, ["a", "b"], ascending=ascending)
+
+    for column in ("a", "b"):
+        # Ties are broken by country name, so "first" is taken in name order
+        expected = df[["country", column]].dropna().sort_values("country").reset_index(drop=True)
+        for rank_column, method in (("rank", "first"), ("dense_rank", "dense"), ("min_rank", "min")):
+            expected[rank_column] = expected[column].rank(method=method, ascending=ascending).astype(int)
+        expected = expected.sort_values("rank").reset_index(drop=True)
+
+        pd.testing.assert_frame_equal(
+            rankings[column][["country", column, "rank", "dense_rank", "min_rank"]].astype({"country": object}),
+            expected.astype({"country": object}),
+            check_dtype=False,
+        )
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard import regional
+
+
+def _frame(seed=0):
+    rng = np.random.default_rng(seed)
+    rows = 400
+    df = pd.DataFrame({
+        "region": pd.Categorical(rng.choice(["Asia", "Africa", "Europe", "Oceania"], rows),
+                                 categories=["Africa", "Asia", "Europe", "Oceania", "Other"]),
+        "year": rng.integers(2000, 2021, rows).astype(np.int16),
+        "a": rng.uniform(0, 1, rows).astype(np.float32),
+        "b": rng.uniform(0, 1, rows),
+    })
+    df.loc[rng.random(rows) < 0.3, "a"] = np.nan
+    df.loc[rng.random(rows) < 0.3, "b"] = np.nan
+    # A region whose rows in one year range have no values at all
+    df.loc[df["region"] == "Oceania", "b"] = np.nan
+    df.loc[(df["region"] == "Oceania") & (df["year"] < 2005), "a"] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("year_range", [None, (2000, 2020), (2001, 2004), (2010, 2010), (2030, 2040)])
+def test_regional_averages_match_groupby(year_range):
+    df = _frame()
+    before = df.copy()
+    result = regional.calculate_regional_averages(df, "region", ["a", "b"], "index_average", year_range)
+
+    rows = df if year_range is None else df[df["year"].between(*year_range)]
+    expected = rows.groupby("region", observed=True)[["a", "b"]].mean().reset_index()
+    expected["index_average"] = expected[["a", "b"]].mean(axis=1)
+
+    pd.testing.assert_frame_equal(
+        result.astype({"region": object}), expected.astype({"region": object}),
+        check_dtype=False, rtol=1e-6,
+    )
+    pd.testing.assert_frame_equal(df, before)
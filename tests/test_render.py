@@ -0,0 +1,30 @@
+from dashboard import render
+
+
+def test_render_cache_lru():
+    cache = render.RenderCache(max_entries=2)
+    built = []
+
+    def build(key):
+        def build_value():
+            built.append(key)
+            return {"key": key}
+        return build_value
+
+    first = cache.get("a", build("a"))
+    cache.get("b", build("b"))
+    # The same object comes back, and "a" becomes the most recently used
+    assert cache.get("a", build("a")) is first
+    cache.get("c", build("c"))
+
+    assert built == ["a", "b", "c"]
+    assert cache.stats() == {"entries": 2, "max_entries": 2, "hits": 1, "misses": 3}
+
+    # "b" was evicted, "a" and "c" were kept
+    cache.get("a", build("a"))
+    cache.get("c", build("c"))
+    cache.get("b", build("b"))
+    assert built == ["a", "b", "c", "b"]
+
+    cache.clear()
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,73 @@
+import asyncio
+import json
+import threading
+import time
+from http import HTTPStatus
+
+import pytest
+
+from dashboard import data, service, trends
+
+
+@pytest.fixture
+def endpoint(monkeypatch):
+    """Register /api/test; returns the list of params it was computed for."""
+    calls = []
+    lock = threading.Lock()
+
+    def payload(params):
+        with lock:
+            calls.append(params)
+        time.sleep(0.05)
+        if params.get("pending"):
+            raise trends.SlopeTablePending("Trend slope table is still being computed")
+        return {"value": params.get("value", "a")}
+
+    monkeypatch.setitem(service.ENDPOINTS, "/api/test", payload)
+    monkeypatch.setattr(data, "active_version", lambda: "v1")
+    return calls
+
+
+def test_etag_and_not_modified(endpoint):
+    async def scenario():
+        svc = service.DashboardService()
+        status, headers, body = await svc.handle("GET", "/api/test?value=a", {})
+        assert status == HTTPStatus.OK
+        assert json.loads(body) == {"value": "a"}
+
+        etag = headers["ETag"]
+        assert etag.startswith('"v1-')
+        repeat = await svc.handle("GET", "/api/test?value=a", {"if-none-match": etag})
+        other = await svc.handle("GET", "/api/test?value=b", {"if-none-match": etag})
+        return repeat, other
+
+    (status, headers, body), (other_status, _, _) = asyncio.run(scenario())
+    assert status == HTTPStatus.NOT_MODIFIED and body == b""
+    assert other_status == HTTPStatus.OK
+    # The 304 was answered from the TTL cache
+    assert len(endpoint) == 2
+
+
+def test_concurrent_misses_share_one_computation(endpoint):
+    async def scenario():
+        svc = service.DashboardService()
+        return await asyncio.gather(*(svc.handle("GET", "/api/test?value=a", {}) for _ in range(5)))
+
+    responses = asyncio.run(scenario())
+    assert len(endpoint) == 1
+    assert len({headers["ETag"] for _, headers, _ in responses}) == 1
+
+
+def test_pending_slope_table_is_503(endpoint):
+    async def scenario():
+        svc = service.DashboardService()
+        first = await svc.handle("GET", "/api/test?pending=1", {})
+        second = await svc.handle("GET", "/api/test?pending=1", {})
+        return first, second
+
+    (status, headers, body), _ = asyncio.run(scenario())
+    assert status == HTTPStatus.SERVICE_UNAVAILABLE
+    assert headers["Retry-After"] == str(service.RETRY_AFTER)
+    assert "error" in json.loads(body)
+    # Not cached: the next request computes again
+    assert len(endpoint) == 2
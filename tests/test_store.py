@@ -0,0 +1,84 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard import store
+
+
+def _write_csv(path, rows):
+    pd.DataFrame(rows, columns=["country", "year", "comp_prim_v2_m", "iso_code"]).to_csv(path, index=False)
+    # Distinct mtimes even when the file is rewritten within the clock resolution
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9 * len(rows)))
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / "education_data.csv"), str(tmp_path / "cache")
+
+
+def test_round_trip(paths):
+    csv_path, cache_dir = paths
+    _write_csv(csv_path, [
+        ("Peru", 2015, 23.97, "PER"),
+        ("Chile", 2016, None, "CHL"),
+        (None, 2017, 50.0, "XXX"),
+        ("Chile", None, 60.0, "CHL"),
+        ("Chile", 2018, 0.5, "CHL"),
+    ])
+
+    df = store.read_columns(csv_path=csv_path, cache_dir=cache_dir)
+    expected = pd.read_csv(csv_path).dropna(subset=store.KEY_COLUMNS).reset_index(drop=True)
+
+    assert list(df.columns) == list(expected.columns)
+    assert df["year"].dtype == np.int16
+    assert df["comp_prim_v2_m"].dtype == np.float32
+    assert isinstance(df["country"].dtype, pd.CategoricalDtype)
+    assert df["country"].astype(str).tolist() == expected["country"].tolist()
+    assert df["iso_code"].astype(str).tolist() == expected["iso_code"].tolist()
+    assert df["year"].tolist() == expected["year"].astype(int).tolist()
+    np.testing.assert_allclose(df["comp_prim_v2_m"], expected["comp_prim_v2_m"], rtol=1e-6)
+
+    assert store.store_columns(csv_path, cache_dir) == list(expected.columns)
+    assert list(store.read_columns(["year", "country"], csv_path, cache_dir).columns) == ["year", "country"]
+    with pytest.raises(KeyError):
+        store.read_columns(["missing"], csv_path, cache_dir)
+
+
+def test_versions(paths):
+    csv_path, cache_dir = paths
+    versions = []
+    for n_rows in (1, 2, 3):
+        _write_csv(csv_path, [("Peru", 2000 + year, 1.0, "PER") for year in range(n_rows)])
+        version_dir = store.ensure_store(csv_path, cache_dir)
+        assert len(store.read_columns(csv_path=csv_path, cache_dir=cache_dir)) == n_rows
+        versions.append(os.path.basename(version_dir))
+
+    assert len(set(versions)) == 3
+    # The current and the previous version stay; older ones are removed
+    on_disk = {entry for entry in os.listdir(cache_dir) if os.path.isdir(os.path.join(cache_dir, entry))}
+    assert on_disk == set(versions[1:])
+
+    # Touching the file without changing it keeps the version
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert os.path.basename(store.ensure_store(csv_path, cache_dir)) == versions[-1]
+
+
+def test_widen_floats():
+    df = pd.DataFrame({
+        "country": ["Peru", "Chile", "Fiji"],
+        "value": np.array([23.97, 0.1, np.nan], dtype=np.float32),
+        "exact": np.array([0.1, 0.2, 0.3]),
+    })
+    widened = store.widen_floats(df)
+
+    assert widened["value"].dtype == np.float64
+    assert widened["value"].tolist()[:2] == [23.97, 0.1]
+    assert np.isnan(widened["value"].iloc[2])
+    assert widened["exact"].tolist() == [0.1, 0.2, 0.3]
+    # The input is left alone
+    assert df["value"].dtype == np.float32
+    assert "23.97," in widened.to_csv(index=False)
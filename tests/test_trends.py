@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard import trends
+
+
+def _sample(seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    # Groups with 1..8 points, irregular years and a few missing values
+    for i, n_points in enumerate([8, 5, 3, 2, 1, 6]):
+        years = np.sort(rng.choice(np.arange(1995, 2025), n_points, replace=False))
+        values = rng.normal(50, 10, n_points) + 0.7 * (years - 2000)
+        rows += [(f"Country {i}", year, value) for year, value in zip(years, values)]
+    df = pd.DataFrame(rows, columns=["country", "year", "value"])
+    df.loc[[3, 10], "value"] = np.nan
+    return df
+
+
+def test_fit_trends_matches_polyfit():
+    df = _sample()
+    fits = trends.fit_trends(df["country"], df["year"], df["value"])
+
+    expected = {}
+    for country, group in df.dropna().groupby("country"):
+        if len(group) < trends.MIN_POINTS:
+            continue
+        x, y = group["year"].to_numpy(dtype=float), group["value"].to_numpy()
+        slope, intercept = np.polyfit(x, y, 1)
+        residuals = y - (intercept + slope * x)
+        expected[country] = {
+            "n": len(group),
+            "first_year": x.min(),
+            "last_year": x.max(),
+            "slope": slope,
+            "intercept": intercept,
+            "r2": 1 - (residuals ** 2).sum() / ((y - y.mean()) ** 2).sum(),
+        }
+
+    assert sorted(fits.index) == sorted(expected)
+    for country, values in expected.items():
+        for column, value in values.items():
+            assert fits.loc[country, column] == pytest.approx(value, rel=1e-9, abs=1e-9), (country, column)
+
+
+def test_fit_trends_min_points():
+    df = _sample()
+    fits = trends.fit_trends(df["country"], df["year"], df["value"], min_points=6)
+    counts = df.dropna().groupby("country").size()
+    assert sorted(fits.index) == sorted(counts[counts >= 6].index)
+
+
+def test_country_trends_in_percentage_points(dataset):
+    years = np.arange(2000, 2010)
+    column = "comp_prim_v2_m"
+    dataset(pd.DataFrame({
+        "country": ["Peru"] * 10 + ["Chile"] * 10,
+        "year": np.concatenate([years, years]),
+        # Peru is stored in percent, Chile as 0-1 shares: both rise 1 point a year
+        column: np.concatenate([40.0 + (years - 2000), 0.40 + 0.01 * (years - 2000)]),
+    }))
+
+    fits = trends.country_trends(column, (2000, 2009))
+    assert fits.loc["Peru", "slope"] == pytest.approx(1.0, rel=1e-5)
+    assert fits.loc["Chile", "slope"] == pytest.approx(1.0, rel=1e-5)
+    assert fits.loc["Chile", "intercept"] + 2005 * fits.loc["Chile", "slope"] == pytest.approx(45.0, rel=1e-5)
+
+    improvers = trends.fastest_improvers(column, (2000, 2009), n=2)
+    assert sorted(improvers.index) == ["Chile", "Peru"]
+
+
+def test_slope_table_in_percentage_points(dataset):
+    years = np.arange(2000, 2010)
+    column = "comp_prim_v2_m"
+    dataset(pd.DataFrame({
+        "country": ["Peru"] * 10 + ["Chile"] * 10,
+        "year": np.concatenate([years, years]),
+        column: np.concatenate([40.0 + (years - 2000), 0.40 + 0.01 * (years - 2000)]),
+    }))
+
+    table = trends.SlopeTable([column], poll_seconds=3600)
+    slopes = table.get(timeout=10)["slopes"][column]
+    assert slopes.to_dict() == pytest.approx({"Chile": 1.0, "Peru": 1.0}, rel=1e-5)
+
+
+def test_slope_table_pending_when_build_fails(tmp_path, monkeypatch):
+    # No education_data.csv here, so the first build fails
+    monkeypatch.chdir(tmp_path)
+    table = trends.SlopeTable(["comp_prim_v2_m"], poll_seconds=3600)
+    with pytest.raises(trends.SlopeTablePending):
+        table.get(timeout=10)
+
+
+def test_merged_series_breaks_between_groups():
+    df = pd.DataFrame({
+        "country": ["Chile", "Chile", "Kenya", "Peru", "Peru", "Peru"],
+        "year": [2000, 2001, 2000, 2000, 2002, 2003],
+        "value": [1.0, 2.0, 3.0, np.nan, 5.0, 6.0],
+    })
+    x, y, labels = trends.merged_series(df["country"], df["year"], df["value"])
+
+    np.testing.assert_array_equal(x, [2000, 2001, np.nan, 2000, np.nan, 2000, 2002, 2003])
+    np.testing.assert_array_equal(y, [1, 2, np.nan, 3, np.nan, np.nan, 5, 6])
+    assert list(labels) == ["Chile", "Chile", None, "Kenya", None, "Peru", "Peru", "Peru"]
+    # Every labelled point is the row it came from
+    points = pd.DataFrame({"country": labels, "year": x, "value": y}).dropna(subset=["country"])
+    pd.testing.assert_frame_equal(points.reset_index(drop=True), df, check_dtype=False)
+
+
+def test_merged_series_single_group():
+    x, y, labels = trends.merged_series(["Chile"] * 3, [2000, 2001, 2002], [1, 2, 3])
+    np.testing.assert_array_equal(x, [2000, 2001, 2002])
+    assert list(labels) == ["Chile"] * 3
+
+
+def test_country_percentiles_one_value_per_country_year():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "country": np.repeat([f"C{i}" for i in range(20)], 6),
+        "year": np.tile([2000, 2000, 2001, 2002, 2004, 2010], 20),
+        "value": rng.uniform(0, 100, 120),
+    })
+    df.loc[df.index % 7 == 0, "value"] = np.nan
+    band = trends.country_percentiles(df["country"], df["year"], df["value"], (2000, 2004), low=25, high=75)
+
+    # Mean per (country, year) first, so a country with two rows a year counts once
+    means = df[df["year"].between(2000, 2004)].groupby(["year", "country"])["value"].mean().dropna()
+    expected = means.groupby("year").quantile([0.25, 0.5, 0.75]).unstack()
+    assert band["year"].tolist() == [2000, 2001, 2002, 2004]
+    np.testing.assert_allclose(band[["low", "median", "high"]].to_numpy(), expected.to_numpy())
+
+
+def test_percentile_band_in_percent(dataset):
+    years = np.arange(2000, 2003)
+    column = "comp_prim_v2_m"
+    dataset(pd.DataFrame({
+        "country": np.repeat(["Peru", "Chile", "Kenya"], 3),
+        "year": np.tile(years, 3),
+        # Chile is stored as 0-1 shares
+        column: [10.0, 20.0, 30.0, 0.2, 0.3, 0.4, 30.0, 40.0, 50.0],
+    }))
+
+    band = trends.percentile_band(column, (2000, 2002), low=0, high=100)
+    assert band["year"].tolist() == [2000, 2001, 2002]
+    np.testing.assert_allclose(band["low"], [10, 20, 30], rtol=1e-6)
+    np.testing.assert_allclose(band["median"], [20, 30, 40], rtol=1e-6)
+    np.testing.assert_allclose(band["high"], [30, 40, 50], rtol=1e-6)